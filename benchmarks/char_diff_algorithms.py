@@ -0,0 +1,101 @@
+"""Compare the character-level diff algorithms on changed hunks.
+
+Run with: uv run python benchmarks/char_diff_algorithms.py
+
+Each case diffs one hunk of ``size`` characters against a copy with ``edits``
+random single-character edits, as ``_refine_diff`` does for a changed region.
+Times are the median of several runs, in milliseconds.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+
+from vscodiff.common.range import Range
+from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+    BitParallelLcsDiffing,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+    DiffAlgorithm,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.dynamic_programming_diffing import (
+    DynamicProgrammingDiffing,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+    MyersDiffAlgorithm,
+)
+from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import (
+    LinesSliceCharSequence,
+)
+
+ALGORITHMS: dict[str, DiffAlgorithm] = {
+    "dp": DynamicProgrammingDiffing(),
+    "myers": MyersDiffAlgorithm(),
+    "bit-parallel": BitParallelLcsDiffing(),
+}
+
+CASES = [
+    (60, 2),
+    (200, 5),
+    (200, 50),
+    (1000, 10),
+    (1000, 300),
+    (5000, 20),
+    (5000, 1500),
+]
+
+WORDS = ["foo", "barBaz", "return", "if (a)", "{", "}", ";", "camelCase", "42"]
+
+
+def _make_hunk(rng: random.Random, size: int, edits: int) -> tuple[str, str]:
+    text = ""
+    while len(text) < size:
+        text += rng.choice(WORDS) + rng.choice([" ", ", ", "(", ".", "\n"])
+
+    text = text[:size]
+    chars = list(text)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[i] = rng.choice("abcxyz_ ")
+        elif op < 0.7:
+            chars.insert(i, rng.choice("abcxyz_ "))
+        elif len(chars) > 1:
+            del chars[i]
+
+    return text, "".join(chars)
+
+
+def _slice(text: str) -> LinesSliceCharSequence:
+    lines = text.split("\n")
+    return LinesSliceCharSequence(
+        lines, Range(1, 1, len(lines), len(lines[-1]) + 1), True
+    )
+
+
+def _time(algorithm: DiffAlgorithm, original: str, modified: str) -> float:
+    seq1 = _slice(original)
+    seq2 = _slice(modified)
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        algorithm.compute(seq1, seq2)
+        runs.append(time.perf_counter() - start)
+
+    return statistics.median(runs) * 1000
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'size':>6} {'edits':>6}" + "".join(f"{n:>14}" for n in ALGORITHMS))
+    for size, edits in CASES:
+        original, modified = _make_hunk(rng, size, edits)
+        timings = [_time(a, original, modified) for a in ALGORITHMS.values()]
+        print(f"{size:>6} {edits:>6}" + "".join(f"{t:>14.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
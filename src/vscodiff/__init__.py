@@ -1,6 +1,8 @@
 """vscodiff — Python implementation of VS Code's diff algorithm."""
 
 from vscodiff.engine import VSCDiff, VSCDiffOptions, DiffOptions
+from vscodiff.async_provider import AsyncDocumentDiffProvider
+from vscodiff.common.cache import CacheStats
 from vscodiff.common.diff.diff_change import DiffChange, DiffResult
 from vscodiff.common.diff.diff import LcsDiff, Sequence, StringDiffSequence, string_diff
 from vscodiff.common.line_range import LineRange
@@ -19,6 +21,7 @@ from vscodiff.diff.lines_diff_computer import (
     LinesDiffComputerOptions,
     MovedText,
 )
+from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
 from vscodiff.diff.model import GetValueOptions, TextModel
 from vscodiff.diff.range_mapping import (
     DetailedLineRangeMapping,
@@ -31,6 +34,8 @@ __all__ = [
     "VSCDiff",
     "VSCDiffOptions",
     "DiffOptions",
+    "CacheStats",
+    "PersistentDiffCache",
     # Diff result types
     "DiffChange",
     "DiffResult",
@@ -40,6 +45,8 @@ __all__ = [
     "RangeMapping",
     "LinesDiff",
     "MovedText",
+    # Providers
+    "AsyncDocumentDiffProvider",
     # Interfaces
     "DocumentDiffProvider",
     "DocumentDiffProviderOptions",
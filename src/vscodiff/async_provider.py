@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import asdict
+
+from vscodiff.common.errors import CancellationError
+from vscodiff.diff.document_diff_provider import (
+    DocumentDiff,
+    DocumentDiffProvider,
+    DocumentDiffProviderOptions,
+)
+from vscodiff.diff.model import TextModel
+from vscodiff.engine import DiffOptions, VSCDiff
+
+
+class AsyncDocumentDiffProvider(DocumentDiffProvider):
+    """``DocumentDiffProvider`` that runs ``VSCDiff`` in an executor.
+
+    Concurrent requests for the same documents and options share one in-flight
+    computation. Once every caller awaiting a computation has been cancelled it
+    is no longer shared; ``dispose`` releases all of them, and their callers (as
+    well as later ones) get a ``CancellationError``. A computation that already
+    started in the executor cannot be stopped: it runs to completion and its
+    result still fills the cache.
+    """
+
+    def __init__(
+        self,
+        diff: VSCDiff | None = None,
+        executor: Executor | None = None,
+    ):
+        self._diff = diff if diff is not None else VSCDiff()
+        self._executor = executor
+        self._in_flight: dict[str, asyncio.Future[DocumentDiff]] = {}
+        self._waiters: dict[str, int] = {}
+        self._disposed = False
+
+    async def compute_diff(
+        self,
+        original: TextModel,
+        modified: TextModel,
+        options: DocumentDiffProviderOptions,
+    ) -> DocumentDiff:
+        if self._disposed:
+            raise CancellationError()
+
+        original_text = "\n".join(original.get_lines_content())
+        modified_text = "\n".join(modified.get_lines_content())
+        diff_options = (
+            options
+            if isinstance(options, DiffOptions)
+            else DiffOptions(**asdict(options))
+        )
+        key = self._diff.get_diff_cache_key(
+            self._diff.get_content_key(original_text),
+            self._diff.get_content_key(modified_text),
+            diff_options,
+        )
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                self._diff.compute_diff,
+                original_text,
+                modified_text,
+                diff_options,
+            )
+            self._in_flight[key] = future
+            self._waiters[key] = 0
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if future.cancelled() and (task is None or task.cancelling() == 0):
+                raise CancellationError() from None
+
+            raise
+        finally:
+            self._release(key, future)
+
+    def _release(self, key: str, future: asyncio.Future[DocumentDiff]) -> None:
+        if self._in_flight.get(key) is not future:
+            return
+
+        self._waiters[key] -= 1
+        if self._waiters[key] == 0 or future.done():
+            del self._in_flight[key]
+            del self._waiters[key]
+            future.cancel()
+
+    def dispose(self) -> None:
+        self._disposed = True
+        for future in self._in_flight.values():
+            future.cancel()
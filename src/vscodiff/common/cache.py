@@ -1,34 +1,156 @@
 from __future__ import annotations
 
+import threading
 from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    weight: int
+    """total weight of the cached values (bytes for byte-budgeted caches)"""
+    hits: int
+    misses: int
+    evictions: int
 
 
 class LRUCache[K, V]:
-    def __init__(self, capacity: int):
+    """Least-recently-used cache bounded by the total weight of its values.
+
+    Without a ``weigher`` every value weighs 1, so ``capacity`` is an entry
+    count. With a ``weigher`` (e.g. an estimate of the value's size in bytes)
+    ``capacity`` is a budget in the weigher's unit, and a value heavier than
+    the whole budget is not cached at all. All operations are thread-safe.
+    """
+
+    def __init__(self, capacity: int, weigher: Callable[[V], int] | None = None):
         if capacity < 1:
             raise ValueError("Capacity must be at least 1")
 
         self._capacity = capacity
-        self._cache: OrderedDict[K, V] = OrderedDict()
+        self._weigher = weigher
+        self._cache: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._weight = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
 
     def get(self, key: K) -> V | None:
-        if key not in self._cache:
-            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
 
-        self._cache.move_to_end(key)
-        return self._cache[key]
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def peek(self, key: K) -> V | None:
+        """Like ``get``, but neither counts a hit or miss nor refreshes recency."""
+        with self._lock:
+            entry = self._cache.get(key)
+            return entry[0] if entry is not None else None
 
     def put(self, key: K, value: V) -> None:
-        if key in self._cache:
-            self._cache.pop(key)
+        weight = self._weigher(value) if self._weigher is not None else 1
+
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._weight -= previous[1]
 
-        self._cache[key] = value
+            if weight > self._capacity:
+                return
 
-        if len(self._cache) > self._capacity:
-            self._cache.popitem(last=False)
+            self._cache[key] = (value, weight)
+            self._weight += weight
+
+            while self._weight > self._capacity:
+                _, (_, evicted_weight) = self._cache.popitem(last=False)
+                self._weight -= evicted_weight
+                self._evictions += 1
 
     def clear(self) -> None:
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._weight = 0
 
     def size(self) -> int:
         return len(self._cache)
+
+    def weight(self) -> int:
+        return self._weight
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                entries=len(self._cache),
+                weight=self._weight,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+class ShardedLRUCache[K, V]:
+    """``LRUCache`` split into independently locked shards by key hash, so
+    threads working on different keys rarely contend for the same lock.
+
+    The capacity is divided evenly between the shards and recency is tracked
+    per shard, so eviction order is only approximately least-recently-used.
+    With a ``weigher``, a value heavier than one shard's part of the capacity is
+    not cached, even though it would fit in the total.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        shard_count: int,
+        weigher: Callable[[V], int] | None = None,
+    ):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        if shard_count < 1:
+            raise ValueError("Shard count must be at least 1")
+
+        shard_capacity = -(-capacity // shard_count)
+        self._shards: list[LRUCache[K, V]] = [
+            LRUCache(shard_capacity, weigher) for _ in range(shard_count)
+        ]
+
+    def _shard(self, key: K) -> LRUCache[K, V]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: K) -> V | None:
+        return self._shard(key).get(key)
+
+    def peek(self, key: K) -> V | None:
+        return self._shard(key).peek(key)
+
+    def put(self, key: K, value: V) -> None:
+        self._shard(key).put(key, value)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    def size(self) -> int:
+        return sum(shard.size() for shard in self._shards)
+
+    def weight(self) -> int:
+        return sum(shard.weight() for shard in self._shards)
+
+    def stats(self) -> CacheStats:
+        shard_stats = [shard.stats() for shard in self._shards]
+        return CacheStats(
+            entries=sum(s.entries for s in shard_stats),
+            weight=sum(s.weight for s in shard_stats),
+            hits=sum(s.hits for s in shard_stats),
+            misses=sum(s.misses for s in shard_stats),
+            evictions=sum(s.evictions for s in shard_stats),
+        )
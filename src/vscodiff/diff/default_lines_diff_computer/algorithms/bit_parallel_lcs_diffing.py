@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from vscodiff.common.offset_range import OffsetRange
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+    DiffAlgorithm,
+    DiffAlgorithmResult,
+    InfiniteTimeout,
+    Sequence,
+    SequenceDiff,
+    Timeout,
+    append_unresolved_diff,
+)
+
+
+class BitParallelLcsDiffing(DiffAlgorithm):
+    """Longest-common-subsequence alignment computed with bit vectors.
+
+    Each row of the LCS table is encoded as one integer with a bit per element
+    of ``seq2`` (Allison-Dix / Hyyrö), so a row costs a few big-integer
+    operations instead of a Python loop over its cells. The rows are kept for
+    the traceback, which makes memory ``len(seq1) * len(seq2)`` bits.
+
+    Unlike ``DynamicProgrammingDiffing`` there is no bonus for long runs of
+    equal elements, so among alignments of equal length the chosen one may
+    differ.
+    """
+
+    def compute(
+        self,
+        seq1: Sequence,
+        seq2: Sequence,
+        timeout: Timeout | None = None,
+    ) -> DiffAlgorithmResult:
+        if timeout is None:
+            timeout = InfiniteTimeout.instance
+
+        if seq1.length == 0 or seq2.length == 0:
+            return DiffAlgorithmResult.trivial(seq1, seq2)
+
+        elements1 = [seq1.get_element(s1) for s1 in range(seq1.length)]
+        elements2 = [seq2.get_element(s2) for s2 in range(seq2.length)]
+
+        # Bit s2 of match_masks[e] is set when elements2[s2] == e.
+        match_masks: dict[int, int] = {}
+        for s2, element in enumerate(elements2):
+            match_masks[element] = match_masks.get(element, 0) | (1 << s2)
+
+        # A zero bit s2 in rows[s1 + 1] means that the LCS of elements1[: s1 + 1]
+        # and elements2[: s2 + 1] is one longer than that of elements2[:s2].
+        all_ones = (1 << len(elements2)) - 1
+        row = all_ones
+        rows = [row]
+        result: list[SequenceDiff] = []
+        for element in elements1:
+            if not timeout.is_valid():
+                append_unresolved_diff(
+                    result, seq1, seq2, 0, seq1.length, 0, seq2.length
+                )
+                return DiffAlgorithmResult(result, True)
+
+            matches = row & match_masks.get(element, 0)
+            row = ((row + matches) | (row - matches)) & all_ones
+            rows.append(row)
+
+        last_aligning_pos_s1 = seq1.length
+        last_aligning_pos_s2 = seq2.length
+
+        def report_decreasing_aligning_positions(s1: int, s2: int) -> None:
+            nonlocal last_aligning_pos_s1, last_aligning_pos_s2
+            if s1 + 1 != last_aligning_pos_s1 or s2 + 1 != last_aligning_pos_s2:
+                result.append(
+                    SequenceDiff(
+                        OffsetRange(s1 + 1, last_aligning_pos_s1),
+                        OffsetRange(s2 + 1, last_aligning_pos_s2),
+                    )
+                )
+
+            last_aligning_pos_s1 = s1
+            last_aligning_pos_s2 = s2
+
+        s1 = seq1.length - 1
+        s2 = seq2.length - 1
+        while s1 >= 0 and s2 >= 0:
+            if elements1[s1] == elements2[s2]:
+                report_decreasing_aligning_positions(s1, s2)
+                s1 -= 1
+                s2 -= 1
+            elif rows[s1 + 1] >> s2 & 1:
+                # Dropping elements2[s2] does not shorten the LCS.
+                s2 -= 1
+            else:
+                s1 -= 1
+
+        report_decreasing_aligning_positions(-1, -1)
+        result.reverse()
+        return DiffAlgorithmResult(result, False)
@@ -53,6 +53,16 @@ InfiniteTimeout.instance = InfiniteTimeout()
 
 
 class DateTimeout(Timeout):
+    """Expires ``timeout`` milliseconds after its creation.
+
+    Reading the clock costs more than a cell of the diff tables, so the clock
+    is only read every few calls. The number of calls between reads adapts to
+    keep reads about ``CHECK_INTERVAL_MS`` apart, up to ``MAX_CALLS_PER_CHECK``.
+    """
+
+    CHECK_INTERVAL_MS = 1
+    MAX_CALLS_PER_CHECK = 64
+
     def __init__(self, timeout: int):
         if timeout <= 0:
             raise BugIndicatingError("timeout must be positive")
@@ -60,13 +70,33 @@ class DateTimeout(Timeout):
         self._timeout = timeout
         self._start_time = time.monotonic() * 1000
         self._valid = True
+        self._last_check_time = self._start_time
+        self._calls_per_check = 1
+        self._calls_until_check = 0
 
     def is_valid(self) -> bool:
-        valid = (time.monotonic() * 1000) - self._start_time < self._timeout
-        if not valid and self._valid:
+        if not self._valid:
+            return False
+
+        self._calls_until_check -= 1
+        if self._calls_until_check > 0:
+            return True
+
+        now = time.monotonic() * 1000
+        if now - self._start_time >= self._timeout:
             self._valid = False
+            return False
 
-        return self._valid
+        if now - self._last_check_time < self.CHECK_INTERVAL_MS / 2:
+            self._calls_per_check = min(
+                self._calls_per_check * 2, self.MAX_CALLS_PER_CHECK
+            )
+        elif now - self._last_check_time > self.CHECK_INTERVAL_MS:
+            self._calls_per_check = 1
+
+        self._last_check_time = now
+        self._calls_until_check = self._calls_per_check
+        return True
 
     def disable(self):
         self._timeout = Constants.MAX_SAFE_SMALL_INT
@@ -195,7 +225,7 @@ class SequenceDiff:
     def intersect(self, other: SequenceDiff):
         i1 = self.seq1_range.intersect(other.seq1_range)
         i2 = self.seq2_range.intersect(other.seq2_range)
-        if not i1 or not i2:
+        if i1 is None or i2 is None:
             return
 
         return SequenceDiff(i1, i2)
@@ -207,6 +237,59 @@ class SequenceDiff:
         return OffsetPair(self.seq1_range.end_exclusive, self.seq2_range.end_exclusive)
 
 
+def append_or_join_diff(
+    diffs: list[SequenceDiff], start1: int, end1: int, start2: int, end2: int
+) -> None:
+    """Appends the diff to ``diffs``, joining it with the last one if they touch."""
+    if diffs:
+        last = diffs[-1]
+        if (
+            last.seq1_range.end_exclusive == start1
+            and last.seq2_range.end_exclusive == start2
+        ):
+            diffs[-1] = SequenceDiff(
+                OffsetRange(last.seq1_range.start, end1),
+                OffsetRange(last.seq2_range.start, end2),
+            )
+            return
+
+    diffs.append(SequenceDiff(OffsetRange(start1, end1), OffsetRange(start2, end2)))
+
+
+def append_unresolved_diff(
+    diffs: list[SequenceDiff],
+    seq1: Sequence,
+    seq2: Sequence,
+    start1: int,
+    end1: int,
+    start2: int,
+    end2: int,
+) -> None:
+    """Appends a region left unresolved by a timeout as one coarse diff.
+
+    The common prefix and suffix of the region are cut off first, so only its
+    middle is reported as changed.
+    """
+    while (
+        start1 < end1
+        and start2 < end2
+        and seq1.get_element(start1) == seq2.get_element(start2)
+    ):
+        start1 += 1
+        start2 += 1
+
+    while (
+        start1 < end1
+        and start2 < end2
+        and seq1.get_element(end1 - 1) == seq2.get_element(end2 - 1)
+    ):
+        end1 -= 1
+        end2 -= 1
+
+    if start1 != end1 or start2 != end2:
+        append_or_join_diff(diffs, start1, end1, start2, end2)
+
+
 @dataclass(eq=True)
 class OffsetPair:
     offset1: int
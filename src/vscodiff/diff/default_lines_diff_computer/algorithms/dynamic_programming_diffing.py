@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from array import array
 from typing import Callable
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
 from vscodiff.common.offset_range import OffsetRange
 from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
     DiffAlgorithm,
@@ -10,11 +16,20 @@ from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import
     Sequence,
     SequenceDiff,
     Timeout,
+    append_unresolved_diff,
 )
-from vscodiff.diff.default_lines_diff_computer.utils import Array2D
 
 
 class DynamicProgrammingDiffing(DiffAlgorithm):
+    """LCS-style alignment that prefers long runs of equal elements.
+
+    When NumPy is installed, tables of at least ``VECTORIZED_MIN_CELLS`` cells
+    are filled one anti-diagonal at a time with array operations; the result is
+    the same as that of the pure-Python loop.
+    """
+
+    VECTORIZED_MIN_CELLS = 4096
+
     def compute(
         self,
         seq1: Sequence,
@@ -28,49 +43,18 @@ class DynamicProgrammingDiffing(DiffAlgorithm):
         if seq1.length == 0 or seq2.length == 0:
             return DiffAlgorithmResult.trivial(seq1, seq2)
 
-        lcs_lengths = Array2D[float](seq1.length, seq2.length)
-        directions = Array2D[int](seq1.length, seq2.length)
-        lengths = Array2D[int](seq1.length, seq2.length)
-
-        for s1 in range(seq1.length):
-            for s2 in range(seq2.length):
-                if not timeout.is_valid():
-                    return DiffAlgorithmResult.trivial_timeout(seq1, seq2)
-
-                horizontal_len = 0 if s1 == 0 else lcs_lengths.get(s1 - 1, s2)
-                vertical_len = 0 if s2 == 0 else lcs_lengths.get(s1, s2 - 1)
-
-                if seq1.get_element(s1) == seq2.get_element(s2):
-                    if s1 == 0 or s2 == 0:
-                        extended_seq_score: float = 0
-                    else:
-                        extended_seq_score = lcs_lengths.get(s1 - 1, s2 - 1)
-
-                    if s1 > 0 and s2 > 0 and directions.get(s1 - 1, s2 - 1) == 3:
-                        extended_seq_score += lengths.get(s1 - 1, s2 - 1)
-
-                    extended_seq_score += (
-                        equality_score(s1, s2) if equality_score else 1
-                    )
-                else:
-                    extended_seq_score = -1
-
-                new_value = max(horizontal_len, vertical_len, extended_seq_score)
-
-                if new_value == extended_seq_score:
-                    prev_len = lengths.get(s1 - 1, s2 - 1) if s1 > 0 and s2 > 0 else 0
-                    lengths.set(s1, s2, prev_len + 1)
-                    directions.set(s1, s2, 3)
-                elif new_value == horizontal_len:
-                    lengths.set(s1, s2, 0)
-                    directions.set(s1, s2, 1)
-                elif new_value == vertical_len:
-                    lengths.set(s1, s2, 0)
-                    directions.set(s1, s2, 2)
-
-                lcs_lengths.set(s1, s2, new_value)
+        len1 = seq1.length
+        len2 = seq2.length
+        if np is not None and len1 * len2 >= self.VECTORIZED_MIN_CELLS:
+            directions = _fill_tables_vectorized(seq1, seq2, timeout, equality_score)
+        else:
+            directions = _fill_tables(seq1, seq2, timeout, equality_score)
 
         result: list[SequenceDiff] = []
+        if directions is None:
+            append_unresolved_diff(result, seq1, seq2, 0, len1, 0, len2)
+            return DiffAlgorithmResult(result, True)
+
         last_aligning_pos_s1 = seq1.length
         last_aligning_pos_s2 = seq2.length
 
@@ -87,15 +71,16 @@ class DynamicProgrammingDiffing(DiffAlgorithm):
             last_aligning_pos_s1 = s1
             last_aligning_pos_s2 = s2
 
-        s1 = seq1.length - 1
-        s2 = seq2.length - 1
+        s1 = len1 - 1
+        s2 = len2 - 1
         while s1 >= 0 and s2 >= 0:
-            if directions.get(s1, s2) == 3:
+            direction = directions[s1 * len2 + s2]
+            if direction == 3:
                 report_decreasing_aligning_positions(s1, s2)
                 s1 -= 1
                 s2 -= 1
             else:
-                if directions.get(s1, s2) == 1:
+                if direction == 1:
                     s1 -= 1
                 else:
                     s2 -= 1
@@ -103,3 +88,132 @@ class DynamicProgrammingDiffing(DiffAlgorithm):
         report_decreasing_aligning_positions(-1, -1)
         result.reverse()
         return DiffAlgorithmResult(result, False)
+
+
+# Both fill functions return the direction table as a flat row-major buffer:
+# cell (s1, s2) is at s1 * len2 + s2 and holds 1 (horizontal), 2 (vertical) or
+# 3 (diagonal). They return None when the timeout expires.
+
+
+def _fill_tables(
+    seq1: Sequence,
+    seq2: Sequence,
+    timeout: Timeout,
+    equality_score: Callable[[int, int], float] | None,
+) -> bytearray | None:
+    len1 = seq1.length
+    len2 = seq2.length
+    size = len1 * len2
+    lcs_lengths = array("d", [0.0]) * size
+    directions = bytearray(size)
+    lengths = array("i", [0]) * size
+
+    elements2 = [seq2.get_element(s2) for s2 in range(len2)]
+
+    for s1 in range(len1):
+        if not timeout.is_valid():
+            return None
+
+        element1 = seq1.get_element(s1)
+        row = s1 * len2
+        for s2 in range(len2):
+            i = row + s2
+            horizontal_len = 0 if s1 == 0 else lcs_lengths[i - len2]
+            vertical_len = 0 if s2 == 0 else lcs_lengths[i - 1]
+
+            if element1 == elements2[s2]:
+                if s1 == 0 or s2 == 0:
+                    extended_seq_score: float = 0
+                else:
+                    extended_seq_score = lcs_lengths[i - len2 - 1]
+                    if directions[i - len2 - 1] == 3:
+                        extended_seq_score += lengths[i - len2 - 1]
+
+                extended_seq_score += equality_score(s1, s2) if equality_score else 1
+            else:
+                extended_seq_score = -1
+
+            new_value = max(horizontal_len, vertical_len, extended_seq_score)
+
+            if new_value == extended_seq_score:
+                prev_len = lengths[i - len2 - 1] if s1 > 0 and s2 > 0 else 0
+                lengths[i] = prev_len + 1
+                directions[i] = 3
+            elif new_value == horizontal_len:
+                directions[i] = 1
+            elif new_value == vertical_len:
+                directions[i] = 2
+
+            lcs_lengths[i] = new_value
+
+    return directions
+
+
+def _fill_tables_vectorized(
+    seq1: Sequence,
+    seq2: Sequence,
+    timeout: Timeout,
+    equality_score: Callable[[int, int], float] | None,
+) -> bytes | None:
+    assert np is not None
+    len1 = seq1.length
+    len2 = seq2.length
+
+    elements1 = np.array([seq1.get_element(s1) for s1 in range(len1)])
+    elements2 = np.array([seq2.get_element(s2) for s2 in range(len2)])
+    equal = elements1[:, None] == elements2[None, :]
+
+    scores = np.ones((len1, len2))
+    if equality_score is not None:
+        # Same calls, in the same order, as the cell-by-cell loop.
+        for s1, s2 in zip(*np.nonzero(equal)):
+            scores[s1, s2] = equality_score(int(s1), int(s2))
+
+    # The tables get a leading row and column of zeros, which stand in for
+    # the s1 == 0 and s2 == 0 cases of the loop. In the flattened tables the
+    # cells of an anti-diagonal are width - 1 apart, so each anti-diagonal and
+    # its neighbours above, to the left and diagonally are strided slices.
+    width = len2 + 1
+    size = (len1 + 1) * width
+    lcs_lengths = np.zeros(size)
+    directions = np.zeros(size, dtype=np.uint8)
+    lengths = np.zeros(size, dtype=np.int32)
+    equal_flat = np.zeros(size, dtype=bool)
+    scores_flat = np.zeros(size)
+    equal_flat.reshape(len1 + 1, width)[1:, 1:] = equal
+    scores_flat.reshape(len1 + 1, width)[1:, 1:] = scores
+
+    step = width - 1
+    for diagonal in range(len1 + len2 - 1):
+        if not timeout.is_valid():
+            return None
+
+        first = max(0, diagonal - len2 + 1)
+        last = min(diagonal, len1 - 1)
+        start = first * step + width + diagonal + 1
+        cells = slice(start, start + (last - first) * step + 1, step)
+        above = slice(cells.start - width, cells.stop - width, step)
+        left = slice(cells.start - 1, cells.stop - 1, step)
+        diag = slice(cells.start - width - 1, cells.stop - width - 1, step)
+
+        horizontal_len = lcs_lengths[above]
+        vertical_len = lcs_lengths[left]
+        # Lengths are only non-zero after a diagonal step, so adding them
+        # unconditionally matches the loop's direction check.
+        extended_seq_score = np.where(
+            equal_flat[cells],
+            lcs_lengths[diag] + lengths[diag] + scores_flat[cells],
+            -1.0,
+        )
+        new_value = np.maximum(
+            np.maximum(horizontal_len, vertical_len), extended_seq_score
+        )
+
+        is_diagonal = new_value == extended_seq_score
+        directions[cells] = np.where(
+            is_diagonal, 3, np.where(new_value == horizontal_len, 1, 2)
+        )
+        lengths[cells] = np.where(is_diagonal, lengths[diag] + 1, 0)
+        lcs_lengths[cells] = new_value
+
+    return directions.reshape(len1 + 1, width)[1:, 1:].tobytes()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+    DiffAlgorithm,
+    DiffAlgorithmResult,
+    InfiniteTimeout,
+    Sequence,
+    SequenceDiff,
+    Timeout,
+    append_or_join_diff,
+    append_unresolved_diff,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+    MyersDiffAlgorithm,
+)
+
+
+class HistogramDiffAlgorithm(DiffAlgorithm):
+    """Histogram diff, as in git and JGit.
+
+    Within each region, the run of equal elements containing the element that
+    occurs least often in ``seq1`` becomes an anchor, and the regions before and
+    after it are diffed recursively. Elements that occur more than
+    ``max_occurrences`` times are never used as anchors; a region whose common
+    elements are all that frequent is diffed with ``MyersDiffAlgorithm``.
+
+    Anchoring on rare lines keeps large rewrites close to linear time and aligns
+    them on distinctive lines rather than on braces or blank lines.
+    """
+
+    DEFAULT_MAX_OCCURRENCES = 64
+
+    def __init__(self, max_occurrences: int = DEFAULT_MAX_OCCURRENCES):
+        self._max_occurrences = max_occurrences
+        self._fallback = MyersDiffAlgorithm()
+
+    def compute(
+        self,
+        seq1: Sequence,
+        seq2: Sequence,
+        timeout: Timeout | None = None,
+    ) -> DiffAlgorithmResult:
+        if timeout is None:
+            timeout = InfiniteTimeout.instance
+
+        if seq1.length == 0 or seq2.length == 0:
+            return DiffAlgorithmResult.trivial(seq1, seq2)
+
+        a = [seq1.get_element(i) for i in range(seq1.length)]
+        b = [seq2.get_element(i) for i in range(seq2.length)]
+
+        result: list[SequenceDiff] = []
+        stack = [(0, len(a), 0, len(b))]
+        while stack:
+            if not timeout.is_valid():
+                # Regions already split stay resolved; the rest are coarse.
+                while stack:
+                    append_unresolved_diff(result, seq1, seq2, *stack.pop())
+                return DiffAlgorithmResult(result, True)
+
+            a_start, a_end, b_start, b_end = stack.pop()
+
+            while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+                a_start += 1
+                b_start += 1
+
+            while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+                a_end -= 1
+                b_end -= 1
+
+            if a_start == a_end or b_start == b_end:
+                if a_start != a_end or b_start != b_end:
+                    append_or_join_diff(result, a_start, a_end, b_start, b_end)
+                continue
+
+            anchor = self._find_anchor(a, b, a_start, a_end, b_start, b_end)
+            if anchor is not None:
+                anchor_a, anchor_b, length = anchor
+                stack.append((anchor_a + length, a_end, anchor_b + length, b_end))
+                stack.append((a_start, anchor_a, b_start, anchor_b))
+                continue
+
+            fallback = self._fallback.compute(
+                _ListSequence(a[a_start:a_end]),
+                _ListSequence(b[b_start:b_end]),
+                timeout,
+            )
+            for diff in fallback.diffs:
+                append_or_join_diff(
+                    result,
+                    a_start + diff.seq1_range.start,
+                    a_start + diff.seq1_range.end_exclusive,
+                    b_start + diff.seq2_range.start,
+                    b_start + diff.seq2_range.end_exclusive,
+                )
+
+            if fallback.hit_timeout:
+                while stack:
+                    append_unresolved_diff(result, seq1, seq2, *stack.pop())
+                return DiffAlgorithmResult(result, True)
+
+        return DiffAlgorithmResult(result, False)
+
+    def _find_anchor(
+        self,
+        a: list[int],
+        b: list[int],
+        a_start: int,
+        a_end: int,
+        b_start: int,
+        b_end: int,
+    ) -> tuple[int, int, int] | None:
+        """Returns the start offsets and length of the run of equal elements to
+        split the region at, or ``None`` if no element is rare enough."""
+        occurrences: dict[int, list[int]] = {}
+        for i in range(a_start, a_end):
+            occurrences.setdefault(a[i], []).append(i)
+
+        best: tuple[int, int, int] | None = None
+        best_count = self._max_occurrences
+
+        j = b_start
+        while j < b_end:
+            positions = occurrences.get(b[j])
+            if positions is None or len(positions) > best_count:
+                j += 1
+                continue
+
+            next_j = j + 1
+            for i in positions:
+                count = len(positions)
+                start_a, start_b = i, j
+                while (
+                    start_a > a_start
+                    and start_b > b_start
+                    and a[start_a - 1] == b[start_b - 1]
+                ):
+                    start_a -= 1
+                    start_b -= 1
+                    count = min(count, len(occurrences[a[start_a]]))
+
+                end_a, end_b = i + 1, j + 1
+                while end_a < a_end and end_b < b_end and a[end_a] == b[end_b]:
+                    count = min(count, len(occurrences[a[end_a]]))
+                    end_a += 1
+                    end_b += 1
+
+                length = end_a - start_a
+                if count < best_count or (
+                    count == best_count and (best is None or length > best[2])
+                ):
+                    best = (start_a, start_b, length)
+                    best_count = count
+
+                next_j = max(next_j, end_b)
+
+            j = next_j
+
+        return best
+
+
+class _ListSequence(Sequence):
+    def __init__(self, elements: list[int]):
+        self._elements = elements
+
+    def get_element(self, offset: int) -> int:
+        return self._elements[offset]
+
+    @property
+    def length(self) -> int:
+        return len(self._elements)
+
+    def get_boundary_score(self, length: int) -> int:
+        return 0
+
+    def is_strongly_equal(self, offset1: int, offset2: int) -> bool:
+        return self._elements[offset1] == self._elements[offset2]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+    DiffAlgorithm,
+    DiffAlgorithmResult,
+    InfiniteTimeout,
+    Sequence,
+    SequenceDiff,
+    Timeout,
+    append_or_join_diff,
+    append_unresolved_diff,
+)
+
+
+class LinearSpaceMyersDiffAlgorithm(DiffAlgorithm):
+    """Myers' divide-and-conquer variant: finds the middle snake of an optimal
+    path with a forward and a backward search, then recurses on both halves.
+
+    Memory is linear in the input size. The edit distance is the same as that of
+    ``MyersDiffAlgorithm``, but ties between equally short paths may be broken
+    differently.
+    """
+
+    def compute(
+        self,
+        seq1: Sequence,
+        seq2: Sequence,
+        timeout: Timeout | None = None,
+    ) -> DiffAlgorithmResult:
+        if timeout is None:
+            timeout = InfiniteTimeout.instance
+
+        if seq1.length == 0 or seq2.length == 0:
+            return DiffAlgorithmResult.trivial(seq1, seq2)
+
+        a = [seq1.get_element(i) for i in range(seq1.length)]
+        b = [seq2.get_element(i) for i in range(seq2.length)]
+
+        result: list[SequenceDiff] = []
+        stack = [(0, len(a), 0, len(b))]
+        while stack:
+            a_start, a_end, b_start, b_end = stack.pop()
+
+            while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+                a_start += 1
+                b_start += 1
+
+            while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+                a_end -= 1
+                b_end -= 1
+
+            if a_start == a_end or b_start == b_end:
+                if a_start != a_end or b_start != b_end:
+                    append_or_join_diff(result, a_start, a_end, b_start, b_end)
+                continue
+
+            split = _find_middle_snake(a, b, a_start, a_end, b_start, b_end, timeout)
+            if split is None:
+                # Regions already split stay resolved; the rest are coarse.
+                stack.append((a_start, a_end, b_start, b_end))
+                while stack:
+                    append_unresolved_diff(result, seq1, seq2, *stack.pop())
+                return DiffAlgorithmResult(result, True)
+
+            x, y = split
+            stack.append((x, a_end, y, b_end))
+            stack.append((a_start, x, b_start, y))
+
+        return DiffAlgorithmResult(result, False)
+
+
+def _find_middle_snake(
+    a: list[int],
+    b: list[int],
+    a_start: int,
+    a_end: int,
+    b_start: int,
+    b_end: int,
+    timeout: Timeout,
+) -> tuple[int, int] | None:
+    """Returns the end of the forward half of an optimal path through the box,
+    or ``None`` on timeout. The box must not start or end with a match."""
+    n = a_end - a_start
+    m = b_end - b_start
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    size = 2 * max_d + 2
+    forward = [-1] * size
+    forward[offset + 1] = 0
+    backward = [-1] * size
+    backward[offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0
+    k1_start = k1_end = k2_start = k2_end = 0
+
+    for d in range(max_d):
+        if not timeout.is_valid():
+            return None
+
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (
+                k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]
+            ):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a_start + x1] == b[b_start + y1]:
+                x1 += 1
+                y1 += 1
+
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < size and backward[k2_offset] != -1:
+                    if x1 >= n - backward[k2_offset]:
+                        return a_start + x1, b_start + y1
+
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (
+                k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]
+            ):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a_end - x2 - 1] == b[b_end - y2 - 1]:
+                x2 += 1
+                y2 += 1
+
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    if x1 >= n - x2:
+                        return a_start + x1, b_start + x1 - (k1_offset - offset)
+
+    # Only reachable without any common element, where any split is optimal.
+    return a_end, b_start
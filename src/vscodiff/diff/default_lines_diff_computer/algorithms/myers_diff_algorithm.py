@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from array import array
+
 from vscodiff.common.offset_range import OffsetRange
 from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
     DiffAlgorithm,
@@ -8,10 +10,27 @@ from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import
     Sequence,
     SequenceDiff,
     Timeout,
+    append_unresolved_diff,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.linear_space_myers_diff_algorithm import (
+    LinearSpaceMyersDiffAlgorithm,
 )
 
 
 class MyersDiffAlgorithm(DiffAlgorithm):
+    """Greedy forward Myers diff.
+
+    Every snake on the explored paths is kept until the end, so memory grows
+    with the square of the edit distance. Once more than ``max_snakes`` snakes
+    have been recorded, the diff is computed by
+    ``LinearSpaceMyersDiffAlgorithm`` instead.
+    """
+
+    DEFAULT_MAX_SNAKES = 1 << 22
+
+    def __init__(self, max_snakes: int = DEFAULT_MAX_SNAKES):
+        self._max_snakes = max_snakes
+
     def compute(
         self,
         seq1: Sequence,
@@ -41,18 +60,48 @@ class MyersDiffAlgorithm(DiffAlgorithm):
         d = 0
         v = _FastInt32Array()
         v.set(0, get_x_after_snake(0, 0))
-
-        paths: _FastArrayNegativeIndices[_SnakePath | None] = (
-            _FastArrayNegativeIndices()
-        )
-        paths.set(0, None if v.get(0) == 0 else _SnakePath(None, 0, 0, v.get(0)))
+        if v.get(0) == seq_x.length and v.get(0) == seq_y.length:
+            return DiffAlgorithmResult([], False)
+
+        # The snakes of all paths are kept in flat arrays. ``paths`` maps each
+        # diagonal to the 1-based index of the last snake of its path (0 when
+        # the path has no snake yet) and ``snakes`` holds (prev, x, y, length)
+        # for every snake.
+        paths = _FastInt32Array()
+        snakes = array("i")
+        if v.get(0) != 0:
+            snakes.extend((0, 0, 0, v.get(0)))
+            paths.set(0, 1)
 
         k = 0
+        lower_bound = upper_bound = 0
 
         while True:
             d += 1
             if not timeout.is_valid():
-                return DiffAlgorithmResult.trivial_timeout(seq_x, seq_y)
+                # Keep the path that got furthest through the edit graph and
+                # report the rest of the box as one coarse change.
+                k = max(
+                    range(lower_bound, upper_bound + 1, 2),
+                    key=lambda k: (
+                        2 * v.get(k) - k
+                        if v.get(k) <= seq_x.length
+                        and 0 <= v.get(k) - k <= seq_y.length
+                        else -1
+                    ),
+                )
+                end_x = v.get(k)
+                end_y = end_x - k
+                result = _backtrack(snakes, paths.get(k), end_x, end_y)
+                append_unresolved_diff(
+                    result, seq_x, seq_y, end_x, seq_x.length, end_y, seq_y.length
+                )
+                return DiffAlgorithmResult(result, True)
+
+            if len(snakes) > self._max_snakes * 4:
+                # Free the trace first, the fallback is there to cap memory.
+                del snakes, paths, v
+                return LinearSpaceMyersDiffAlgorithm().compute(seq_x, seq_y, timeout)
 
             lower_bound = -min(d, seq_y.length + (d % 2))
             upper_bound = min(d, seq_x.length + (d % 2))
@@ -70,12 +119,11 @@ class MyersDiffAlgorithm(DiffAlgorithm):
                 last_path = (
                     paths.get(k + 1) if x == max_x_of_d_line_top else paths.get(k - 1)
                 )
-                paths.set(
-                    k,
-                    _SnakePath(last_path, x, y, new_max_x - x)
-                    if new_max_x != x
-                    else last_path,
-                )
+                if new_max_x != x:
+                    snakes.extend((last_path, x, y, new_max_x - x))
+                    paths.set(k, len(snakes) // 4)
+                else:
+                    paths.set(k, last_path)
 
                 if v.get(k) == seq_x.length and v.get(k) - k == seq_y.length:
                     broke = True
@@ -84,47 +132,47 @@ class MyersDiffAlgorithm(DiffAlgorithm):
             if broke:
                 break
 
-        path = paths.get(k)
-        result: list[SequenceDiff] = []
-        last_aligning_pos_s1 = seq_x.length
-        last_aligning_pos_s2 = seq_y.length
-
-        while True:
-            end_x = path.x + path.length if path else 0
-            end_y = path.y + path.length if path else 0
-
-            if end_x != last_aligning_pos_s1 or end_y != last_aligning_pos_s2:
-                result.append(
-                    SequenceDiff(
-                        OffsetRange(end_x, last_aligning_pos_s1),
-                        OffsetRange(end_y, last_aligning_pos_s2),
-                    )
-                )
+        result = _backtrack(snakes, paths.get(k), seq_x.length, seq_y.length)
+        return DiffAlgorithmResult(result, False)
 
-            if not path:
-                break
 
-            last_aligning_pos_s1 = path.x
-            last_aligning_pos_s2 = path.y
+def _backtrack(
+    snakes: array[int], path: int, end_x: int, end_y: int
+) -> list[SequenceDiff]:
+    """Returns the diffs along the path that ends with snake ``path`` (1-based,
+    0 for none) and reaches ``(end_x, end_y)``."""
+    result: list[SequenceDiff] = []
+    last_aligning_pos_s1 = end_x
+    last_aligning_pos_s2 = end_y
+
+    while True:
+        if path:
+            i = (path - 1) * 4
+            prev, path_x, path_y, length = snakes[i : i + 4]
+            snake_end_x = path_x + length
+            snake_end_y = path_y + length
+        else:
+            snake_end_x = 0
+            snake_end_y = 0
+
+        if snake_end_x != last_aligning_pos_s1 or snake_end_y != last_aligning_pos_s2:
+            result.append(
+                SequenceDiff(
+                    OffsetRange(snake_end_x, last_aligning_pos_s1),
+                    OffsetRange(snake_end_y, last_aligning_pos_s2),
+                )
+            )
 
-            path = path.prev
+        if not path:
+            break
 
-        result.reverse()
-        return DiffAlgorithmResult(result, False)
+        last_aligning_pos_s1 = path_x
+        last_aligning_pos_s2 = path_y
 
+        path = prev
 
-class _SnakePath:
-    def __init__(
-        self,
-        prev: _SnakePath | None,
-        x: int,
-        y: int,
-        length: int,
-    ):
-        self.prev = prev
-        self.x = x
-        self.y = y
-        self.length = length
+    result.reverse()
+    return result
 
 
 class _FastInt32Array:
@@ -135,9 +183,11 @@ class _FastInt32Array:
     def get(self, idx: int) -> int:
         if idx < 0:
             idx = -idx - 1
-            return self._negative_arr[idx]
+            arr = self._negative_arr
+        else:
+            arr = self._positive_arr
 
-        return self._positive_arr[idx]
+        return arr[idx] if idx < len(arr) else 0
 
     def set(self, idx: int, value: int) -> None:
         if idx < 0:
@@ -151,29 +201,3 @@ class _FastInt32Array:
                 self._positive_arr.extend([0] * len(self._positive_arr))
 
             self._positive_arr[idx] = value
-
-
-class _FastArrayNegativeIndices[T]:
-    def __init__(self):
-        self._positive_arr: list[T] = []
-        self._negative_arr: list[T] = []
-
-    def get(self, idx: int) -> T:
-        if idx < 0:
-            idx = -idx - 1
-            return self._negative_arr[idx]
-
-        return self._positive_arr[idx]
-
-    def set(self, idx: int, value: T) -> None:
-        if idx < 0:
-            idx = -idx - 1
-            while len(self._negative_arr) <= idx:
-                self._negative_arr.append(None)  # type: ignore
-
-            self._negative_arr[idx] = value
-        else:
-            while len(self._positive_arr) <= idx:
-                self._positive_arr.append(None)  # type: ignore
-
-            self._positive_arr[idx] = value
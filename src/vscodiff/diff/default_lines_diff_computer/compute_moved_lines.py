@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from functools import cmp_to_key
 
@@ -11,7 +12,6 @@ from vscodiff.common.lists import (
     reverse_order,
 )
 from vscodiff.common.lists_find import MonotonousList, find_last_monotonous
-from vscodiff.common.map import SetMap
 from vscodiff.common.range import Range
 from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
     SequenceDiff,
@@ -42,7 +42,7 @@ def compute_moved_lines(
     if not timeout.is_valid():
         return []
 
-    filtered_changes = [c for c in changes if c not in excluded_changes]
+    filtered_changes = [c for c in changes if id(c) not in excluded_changes]
     unchanged_moves = _compute_unchanged_moves(
         filtered_changes,
         hashed_original_lines,
@@ -77,7 +77,7 @@ def _compute_moves_from_simple_deletions_to_simple_insertions(
     original_lines: list[str],
     modified_lines: list[str],
     timeout: Timeout,
-) -> tuple[list[LineRangeMapping], set[DetailedLineRangeMapping]]:
+) -> tuple[list[LineRangeMapping], set[int]]:
     moves: list[LineRangeMapping] = []
 
     deletions = [
@@ -91,22 +91,40 @@ def _compute_moves_from_simple_deletions_to_simple_insertions(
         if c.original.is_empty and len(c.modified) >= 3
     ]
 
-    excluded_changes: set[DetailedLineRangeMapping] = set()
+    # Changes are compared by identity, so the set holds their ids.
+    excluded_changes: set[int] = set()
+
+    # A fragment's similarity to another is at most 1 - |a - b| / (a + b) for
+    # total character counts a and b, so only insertions with
+    # 10 * |a - b| < a + b can exceed the 0.9 threshold. Those are a contiguous
+    # run of the insertions sorted by count.
+    by_count = sorted(range(len(insertions)), key=lambda i: insertions[i].total_count)
+    counts = [insertions[i].total_count for i in by_count]
+    matched = [False] * len(insertions)
 
     for deletion in deletions:
+        count = deletion.total_count
+        lo = bisect_right(counts, 9 * count // 11)
+        hi = bisect_left(counts, -(-11 * count // 9))
+        candidates = sorted(by_count[lo:hi])
+
         highest_similarity = -1.0
-        best: LineRangeFragment | None = None
-        for insertion in insertions:
-            similarity = deletion.compute_similarity(insertion)
+        best: int | None = None
+        for i in candidates:
+            if matched[i]:
+                continue
+
+            similarity = deletion.compute_similarity(insertions[i])
             if similarity > highest_similarity:
                 highest_similarity = similarity
-                best = insertion
+                best = i
 
         if highest_similarity > 0.9 and best is not None:
-            insertions.remove(best)
-            moves.append(LineRangeMapping(deletion.range, best.range))
-            excluded_changes.add(deletion.source)
-            excluded_changes.add(best.source)
+            matched[best] = True
+            insertion = insertions[best]
+            moves.append(LineRangeMapping(deletion.range, insertion.range))
+            excluded_changes.add(id(deletion.source))
+            excluded_changes.add(id(insertion.source))
 
         if not timeout.is_valid():
             return moves, excluded_changes
@@ -130,18 +148,23 @@ def _compute_unchanged_moves(
 ) -> list[LineRangeMapping]:
     moves: list[LineRangeMapping] = []
 
-    original_3_line_hashes: SetMap[str, _RangeHolder] = SetMap()
+    # Each window of 3 lines is keyed by its 3 line hashes packed into one int.
+    key_base = 1 + max(
+        max(hashed_original_lines, default=0), max(hashed_modified_lines, default=0)
+    )
+
+    def window_key(hashes: list[int], i: int) -> int:
+        return (hashes[i - 1] * key_base + hashes[i]) * key_base + hashes[i + 1]
+
+    original_3_line_ranges: dict[int, list[LineRange]] = {}
 
     for change in changes:
         for i in range(
             change.original.start_line, change.original.end_line_exclusive - 2
         ):
-            key = (
-                f"{hashed_original_lines[i - 1]}:"
-                f"{hashed_original_lines[i + 1 - 1]}:"
-                f"{hashed_original_lines[i + 2 - 1]}"
-            )
-            original_3_line_hashes.add(key, _RangeHolder(LineRange(i, i + 3)))
+            original_3_line_ranges.setdefault(
+                window_key(hashed_original_lines, i), []
+            ).append(LineRange(i, i + 3))
 
     possible_mappings: list[_PossibleMapping] = []
 
@@ -154,17 +177,18 @@ def _compute_unchanged_moves(
         for i in range(
             change.modified.start_line, change.modified.end_line_exclusive - 2
         ):
-            key = (
-                f"{hashed_modified_lines[i - 1]}:"
-                f"{hashed_modified_lines[i + 1 - 1]}:"
-                f"{hashed_modified_lines[i + 2 - 1]}"
+            original_ranges = original_3_line_ranges.get(
+                window_key(hashed_modified_lines, i)
             )
+            if original_ranges is None:
+                last_mappings = []
+                continue
+
             current_modified_range = LineRange(i, i + 3)
 
             next_mappings: list[_PossibleMapping] = []
 
-            def visit(holder: _RangeHolder) -> None:
-                range_ = holder.range
+            for range_ in original_ranges:
                 for last_mapping in last_mappings:
                     if (
                         last_mapping.original_line_range.end_line_exclusive + 1
@@ -181,16 +205,15 @@ def _compute_unchanged_moves(
                             current_modified_range.end_line_exclusive,
                         )
                         next_mappings.append(last_mapping)
-                        return
-
-                mapping = _PossibleMapping(
-                    modified_line_range=current_modified_range,
-                    original_line_range=range_,
-                )
-                possible_mappings.append(mapping)
-                next_mappings.append(mapping)
+                        break
+                else:
+                    mapping = _PossibleMapping(
+                        modified_line_range=current_modified_range,
+                        original_line_range=range_,
+                    )
+                    possible_mappings.append(mapping)
+                    next_mappings.append(mapping)
 
-            original_3_line_hashes.for_each(key, visit)
             last_mappings = next_mappings
 
         if not timeout.is_valid():
@@ -351,14 +374,6 @@ def _compute_unchanged_moves(
     return moves
 
 
-@dataclass
-class _RangeHolder:
-    range: LineRange
-
-    def __hash__(self) -> int:
-        return id(self)
-
-
 def _are_lines_similar(line1: str, line2: str, timeout: Timeout) -> bool:
     if line1.strip() == line2.strip():
         return True
@@ -389,6 +404,9 @@ def _are_lines_similar(line1: str, line2: str, timeout: Timeout) -> bool:
         return count
 
     longer_line_length = count_non_ws_chars(line1 if len(line1) > len(line2) else line2)
+    if longer_line_length == 0:
+        return False
+
     return (
         common_non_space_char_count / longer_line_length > 0.6
         and longer_line_length > 10
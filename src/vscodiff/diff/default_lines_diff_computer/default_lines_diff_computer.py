@@ -23,8 +23,10 @@ from vscodiff.diff.range_mapping import (
 )
 from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
     DateTimeout,
+    DiffAlgorithm,
     InfiniteTimeout,
     SequenceDiff,
+    Timeout,
 )
 from vscodiff.diff.default_lines_diff_computer.algorithms.dynamic_programming_diffing import (
     DynamicProgrammingDiffing,
@@ -49,9 +51,20 @@ from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import
 
 
 class DefaultLineDiffComputer(LinesDiffComputer):
-    def __init__(self):
+    def __init__(
+        self,
+        perfect_hashes: dict[str, int] | None = None,
+        char_diff_algorithm: DiffAlgorithm | None = None,
+        line_diff_algorithm: DiffAlgorithm | None = None,
+    ):
         self._dynamic_programming_diffing = DynamicProgrammingDiffing()
         self._myers_diffing_algorithm = MyersDiffAlgorithm()
+        self._perfect_hashes = perfect_hashes
+        # When set, these are used for all character-level refinement and line
+        # alignment respectively, instead of picking dynamic programming or
+        # Myers by size.
+        self._char_diff_algorithm = char_diff_algorithm
+        self._line_diff_algorithm = line_diff_algorithm
 
     def compute_diff(
         self,
@@ -96,15 +109,15 @@ class DefaultLineDiffComputer(LinesDiffComputer):
                 False,
             )
 
-        timeout = (
-            InfiniteTimeout.instance
-            if options.max_computation_time_ms == 0
-            else DateTimeout(options.max_computation_time_ms)
-        )
+        timeout = _create_timeout(options.max_computation_time_ms)
+        line_alignment_timeout = _phase_timeout(timeout, options.line_alignment_time_ms)
         consider_whitespace_changes = not options.ignore_trim_whitespace
 
-        # Create perfect hashes for trimmed line content
-        perfect_hashes: dict[str, int] = {}
+        # Create perfect hashes for trimmed line content, shared with other
+        # computations when the computer was given a perfect hash table
+        perfect_hashes: dict[str, int] = (
+            self._perfect_hashes if self._perfect_hashes is not None else {}
+        )
 
         def get_or_create_hash(text: str) -> int:
             if text not in perfect_hashes:
@@ -122,11 +135,15 @@ class DefaultLineDiffComputer(LinesDiffComputer):
         sequence2 = LineSequence(modified_lines_hashes, modified_lines)
 
         # Choose diff algorithm based on input size
-        if sequence1.length + sequence2.length < 1700:
+        if self._line_diff_algorithm is not None:
+            line_alignment_result = self._line_diff_algorithm.compute(
+                sequence1, sequence2, line_alignment_timeout
+            )
+        elif sequence1.length + sequence2.length < 1700:
             line_alignment_result = self._dynamic_programming_diffing.compute(
                 sequence1,
                 sequence2,
-                timeout,
+                line_alignment_timeout,
                 lambda offset1, offset2: (
                     (
                         0.1
@@ -141,7 +158,7 @@ class DefaultLineDiffComputer(LinesDiffComputer):
             line_alignment_result = self._myers_diffing_algorithm.compute(
                 sequence1,
                 sequence2,
-                timeout,
+                line_alignment_timeout,
             )
 
         line_alignments = line_alignment_result.diffs
@@ -152,6 +169,9 @@ class DefaultLineDiffComputer(LinesDiffComputer):
         )
 
         alignments: list[RangeMapping] = []
+        char_refinement_timeout = _phase_timeout(
+            timeout, options.char_refinement_time_ms
+        )
 
         seq1_last_start = 0
         seq2_last_start = 0
@@ -173,7 +193,7 @@ class DefaultLineDiffComputer(LinesDiffComputer):
                             OffsetRange(seq1_offset, seq1_offset + 1),
                             OffsetRange(seq2_offset, seq2_offset + 1),
                         ),
-                        timeout,
+                        char_refinement_timeout,
                         consider_whitespace_changes,
                         options,
                     )
@@ -199,7 +219,7 @@ class DefaultLineDiffComputer(LinesDiffComputer):
                 original_lines,
                 modified_lines,
                 diff,
-                timeout,
+                char_refinement_timeout,
                 consider_whitespace_changes,
                 options,
             )
@@ -224,7 +244,7 @@ class DefaultLineDiffComputer(LinesDiffComputer):
                 modified_lines,
                 original_lines_hashes,
                 modified_lines_hashes,
-                timeout,
+                _phase_timeout(timeout, options.moves_time_ms),
                 consider_whitespace_changes,
                 options,
             )
@@ -354,7 +374,9 @@ class DefaultLineDiffComputer(LinesDiffComputer):
             consider_whitespace_changes,
         )
 
-        if slice1.length + slice2.length < 500:
+        if self._char_diff_algorithm is not None:
+            diff_result = self._char_diff_algorithm.compute(slice1, slice2, timeout)
+        elif slice1.length + slice2.length < 500:
             diff_result = self._dynamic_programming_diffing.compute(
                 slice1, slice2, timeout
             )
@@ -385,11 +407,11 @@ class DefaultLineDiffComputer(LinesDiffComputer):
         )
 
         result = [
-            RangeMapping(
-                slice1.translate_range(d.seq1_range),
-                slice2.translate_range(d.seq2_range),
+            RangeMapping(original_range, modified_range)
+            for original_range, modified_range in zip(
+                slice1.translate_ranges([d.seq1_range for d in diffs]),
+                slice2.translate_ranges([d.seq2_range for d in diffs]),
             )
-            for d in diffs
         ]
 
         return {
@@ -398,6 +420,15 @@ class DefaultLineDiffComputer(LinesDiffComputer):
         }
 
 
+def _create_timeout(time_ms: int) -> Timeout:
+    return InfiniteTimeout.instance if time_ms == 0 else DateTimeout(time_ms)
+
+
+def _phase_timeout(shared: Timeout, time_ms: int | None) -> Timeout:
+    """Returns the timeout for a phase with an optional budget of its own."""
+    return shared if time_ms is None else _create_timeout(time_ms)
+
+
 def _to_line_range_mapping(sequence_diff: SequenceDiff) -> LineRangeMapping:
     return LineRangeMapping(
         LineRange(
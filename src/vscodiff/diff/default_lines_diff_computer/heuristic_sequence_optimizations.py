@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import math
 import re
+from collections import deque
 from typing import Callable
 
 from vscodiff.common.lists import for_each_with_neighbors
@@ -249,7 +250,7 @@ def extend_diffs_to_entire_word_if_appropriate(
     find_parent: Callable[[LinesSliceCharSequence, int], OffsetRange | None],
     force: bool = False,
 ) -> list[SequenceDiff]:
-    equal_mappings = SequenceDiff.invert(sequence_diffs, sequence1.length)
+    equal_mappings = deque(SequenceDiff.invert(sequence_diffs, sequence1.length))
 
     additional: list[SequenceDiff] = []
 
@@ -293,7 +294,7 @@ def extend_diffs_to_entire_word_if_appropriate(
             w = w.join(v)
 
             if w.seq1_range.end_exclusive >= next_.seq1_range.end_exclusive:
-                equal_mappings.pop(0)
+                equal_mappings.popleft()
             else:
                 break
 
@@ -308,7 +309,7 @@ def extend_diffs_to_entire_word_if_appropriate(
         last_point = w.get_end_exclusive()
 
     while len(equal_mappings) > 0:
-        next_ = equal_mappings.pop(0)
+        next_ = equal_mappings.popleft()
         if next_.seq1_range.is_empty:
             continue
 
@@ -1,14 +1,13 @@
 from __future__ import annotations
 
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import IntEnum
 from typing import Literal
 
 from vscodiff.common.char_code import CharCode
-from vscodiff.common.lists_find import (
-    find_first_monotonous,
-    find_last_idx_monotonous,
-    find_last_monotonous,
-)
 from vscodiff.common.offset_range import OffsetRange
 from vscodiff.common.position import Position
 from vscodiff.common.range import Range
@@ -17,6 +16,8 @@ from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import
 )
 from vscodiff.diff.default_lines_diff_computer.utils import is_space
 
+_NATIVE_UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
 
 class LinesSliceCharSequence(Sequence):
     def __init__(
@@ -29,12 +30,13 @@ class LinesSliceCharSequence(Sequence):
         self._range = range_
         self.consider_whitespace_changes = consider_whitespace_changes
 
-        self._elements: list[int] = []
         self._first_element_offset_by_line_idx: list[int] = []
         self._line_start_offsets: list[int] = []
         self._trimmed_ws_lengths_by_line_idx: list[int] = []
 
         self._first_element_offset_by_line_idx.append(0)
+        sliced_lines: list[str] = []
+        length = 0
         for line_number in range(range_.start_line, range_.end_line + 1):
             line = lines[line_number - 1]
             line_start_offset = 0
@@ -52,20 +54,38 @@ class LinesSliceCharSequence(Sequence):
 
             self._trimmed_ws_lengths_by_line_idx.append(trimmed_ws_length)
 
-            line_length = (
-                min(
-                    range_.end_column - 1 - line_start_offset - trimmed_ws_length,
-                    len(line),
-                )
-                if line_number == range_.end_line
-                else len(line)
-            )
-            for i in range(line_length):
-                self._elements.append(ord(line[i]))
+            if line_number == range_.end_line:
+                line = line[
+                    : max(
+                        range_.end_column - 1 - line_start_offset - trimmed_ws_length,
+                        0,
+                    )
+                ]
 
+            sliced_lines.append(line)
+            length += len(line)
             if line_number < range_.end_line:
-                self._elements.append(ord("\n"))
-                self._first_element_offset_by_line_idx.append(len(self._elements))
+                length += 1
+                self._first_element_offset_by_line_idx.append(length)
+
+        # One element per code point. Encoding the whole slice at once and
+        # viewing the bytes as 32-bit integers builds the buffer in C instead
+        # of boxing every character in a Python list.
+        self._text = "\n".join(sliced_lines)
+        self._elements = array("I", self._text.encode(_NATIVE_UTF32, "surrogatepass"))
+        # The boundary category of every element, padded with END on both
+        # sides, so that ``_categories[length]`` and ``_categories[length + 1]``
+        # are the categories around the boundary before element ``length``.
+        # Characters outside ASCII are all OTHER, like the "?" that replaces
+        # them.
+        self._categories = (
+            _END_CATEGORY
+            + self._text.encode("ascii", "replace").translate(_CATEGORY_BY_BYTE)
+            + _END_CATEGORY
+        )
+        # Start and end offsets of all words and subwords, found on first use.
+        self._words: tuple[list[int], list[int]] | None = None
+        self._sub_words: tuple[list[int], list[int]] | None = None
 
     def __str__(self) -> str:
         return f'Slice: "{self.text}"'
@@ -75,9 +95,7 @@ class LinesSliceCharSequence(Sequence):
         return self.get_text(OffsetRange(0, self.length))
 
     def get_text(self, range_: OffsetRange) -> str:
-        return "".join(
-            chr(e) for e in self._elements[range_.start : range_.end_exclusive]
-        )
+        return self._text[range_.start : range_.end_exclusive]
 
     def get_element(self, offset: int) -> int:
         return self._elements[offset]
@@ -87,42 +105,22 @@ class LinesSliceCharSequence(Sequence):
         return len(self._elements)
 
     def get_boundary_score(self, length: int) -> int:
-        prev_category = _get_category(self._elements[length - 1] if length > 0 else -1)
-        next_category = _get_category(
-            self._elements[length] if length < len(self._elements) else -1
-        )
-
-        if (
-            prev_category == CharBoundaryCategory.LINE_BREAK_CR
-            and next_category == CharBoundaryCategory.LINE_BREAK_LF
-        ):
-            return 0
-
-        if prev_category == CharBoundaryCategory.LINE_BREAK_LF:
-            return 150
-
-        score = 0
-        if prev_category != next_category:
-            score += 10
-            if (
-                prev_category == CharBoundaryCategory.WORD_LOWER
-                and next_category == CharBoundaryCategory.WORD_UPPER
-            ):
-                score += 1
-
-        score += _get_category_boundary_score(prev_category)
-        score += _get_category_boundary_score(next_category)
-
-        return score
+        categories = self._categories
+        return _BOUNDARY_SCORES[
+            categories[length] * _CATEGORY_COUNT + categories[length + 1]
+        ]
 
     def translate_offset(
         self,
         offset: int,
         preference: Literal["left", "right"] = "right",
     ) -> Position:
-        i = find_last_idx_monotonous(
-            self._first_element_offset_by_line_idx, lambda value: value <= offset
-        )
+        i = bisect_right(self._first_element_offset_by_line_idx, offset) - 1
+        return self._translate_offset_in_line(i, offset, preference)
+
+    def _translate_offset_in_line(
+        self, i: int, offset: int, preference: Literal["left", "right"]
+    ) -> Position:
         line_offset = offset - self._first_element_offset_by_line_idx[i]
         return Position(
             self._range.start_line + i,
@@ -144,6 +142,29 @@ class LinesSliceCharSequence(Sequence):
 
         return Range.from_positions(pos1, pos2)
 
+    def translate_ranges(self, ranges: list[OffsetRange]) -> list[Range]:
+        """Same as ``translate_range`` for each range, in one pass over the
+        lines. The ranges must be sorted and must not overlap."""
+        line_starts = self._first_element_offset_by_line_idx
+        line_count = len(line_starts)
+        i = 0
+        result: list[Range] = []
+        for range_ in ranges:
+            while i + 1 < line_count and line_starts[i + 1] <= range_.start:
+                i += 1
+            pos1 = self._translate_offset_in_line(i, range_.start, "right")
+
+            while i + 1 < line_count and line_starts[i + 1] <= range_.end_exclusive:
+                i += 1
+            pos2 = self._translate_offset_in_line(i, range_.end_exclusive, "left")
+
+            if pos2.is_before(pos1):
+                result.append(Range.from_positions(pos2, pos2))
+            else:
+                result.append(Range.from_positions(pos1, pos2))
+
+        return result
+
     def find_word_containing(self, offset: int) -> OffsetRange | None:
         if offset < 0 or offset >= len(self._elements):
             return None
@@ -151,15 +172,10 @@ class LinesSliceCharSequence(Sequence):
         if not _is_word_char(self._elements[offset]):
             return None
 
-        start = offset
-        while start > 0 and _is_word_char(self._elements[start - 1]):
-            start -= 1
+        if self._words is None:
+            self._words = _find_runs(_WORD_PATTERN, self._text)
 
-        end = offset
-        while end < len(self._elements) and _is_word_char(self._elements[end]):
-            end += 1
-
-        return OffsetRange(start, end)
+        return _run_containing(self._words, offset)
 
     def find_sub_word_containing(self, offset: int) -> OffsetRange | None:
         if offset < 0 or offset >= len(self._elements):
@@ -168,51 +184,56 @@ class LinesSliceCharSequence(Sequence):
         if not _is_word_char(self._elements[offset]):
             return None
 
-        start = offset
-        while (
-            start > 0
-            and _is_word_char(self._elements[start - 1])
-            and not _is_upper_case(self._elements[start])
-        ):
-            start -= 1
+        # A subword ends before the next upper case letter, so the one
+        # containing an upper case letter is empty.
+        if _is_upper_case(self._elements[offset]):
+            return OffsetRange(offset, offset)
 
-        end = offset
-        while (
-            end < len(self._elements)
-            and _is_word_char(self._elements[end])
-            and not _is_upper_case(self._elements[end])
-        ):
-            end += 1
+        if self._sub_words is None:
+            self._sub_words = _find_runs(_SUB_WORD_PATTERN, self._text)
 
-        return OffsetRange(start, end)
+        return _run_containing(self._sub_words, offset)
 
     def count_lines_in(self, range_: OffsetRange) -> int:
-        return (
-            self.translate_offset(range_.end_exclusive).line
-            - self.translate_offset(range_.start).line
+        line_starts = self._first_element_offset_by_line_idx
+        return bisect_right(line_starts, range_.end_exclusive) - bisect_right(
+            line_starts, range_.start
         )
 
     def is_strongly_equal(self, offset1: int, offset2: int) -> bool:
         return self._elements[offset1] == self._elements[offset2]
 
     def extend_to_full_lines(self, range_: OffsetRange) -> OffsetRange:
-        start = (
-            find_last_monotonous(
-                self._first_element_offset_by_line_idx,
-                lambda x: x <= range_.start,
-            )
-            or 0
-        )
-        end = find_first_monotonous(
-            self._first_element_offset_by_line_idx,
-            lambda x: range_.end_exclusive <= x,
-        )
-        if end is None:
-            end = len(self._elements)
+        line_starts = self._first_element_offset_by_line_idx
+        i = bisect_right(line_starts, range_.start) - 1
+        start = line_starts[i] if i >= 0 else 0
+        i = bisect_left(line_starts, range_.end_exclusive)
+        end = line_starts[i] if i < len(line_starts) else len(self._elements)
 
         return OffsetRange(start, end)
 
 
+_WORD_PATTERN = re.compile("[a-zA-Z0-9]+")
+_SUB_WORD_PATTERN = re.compile("[a-zA-Z0-9][a-z0-9]*")
+
+
+def _find_runs(pattern: re.Pattern[str], text: str) -> tuple[list[int], list[int]]:
+    starts: list[int] = []
+    ends: list[int] = []
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        starts.append(start)
+        ends.append(end)
+
+    return starts, ends
+
+
+def _run_containing(runs: tuple[list[int], list[int]], offset: int) -> OffsetRange:
+    starts, ends = runs
+    i = bisect_right(starts, offset) - 1
+    return OffsetRange(starts[i], ends[i])
+
+
 def _is_word_char(char_code: int) -> bool:
     return (
         (char_code >= CharCode.a and char_code <= CharCode.z)
@@ -254,6 +275,33 @@ def _get_category_boundary_score(category: CharBoundaryCategory) -> int:
     return _score[category]
 
 
+def _get_boundary_score(
+    prev_category: CharBoundaryCategory, next_category: CharBoundaryCategory
+) -> int:
+    if (
+        prev_category == CharBoundaryCategory.LINE_BREAK_CR
+        and next_category == CharBoundaryCategory.LINE_BREAK_LF
+    ):
+        return 0
+
+    if prev_category == CharBoundaryCategory.LINE_BREAK_LF:
+        return 150
+
+    score = 0
+    if prev_category != next_category:
+        score += 10
+        if (
+            prev_category == CharBoundaryCategory.WORD_LOWER
+            and next_category == CharBoundaryCategory.WORD_UPPER
+        ):
+            score += 1
+
+    score += _get_category_boundary_score(prev_category)
+    score += _get_category_boundary_score(next_category)
+
+    return score
+
+
 def _get_category(char_code: int) -> CharBoundaryCategory:
     if char_code == CharCode.LINE_FEED:
         return CharBoundaryCategory.LINE_BREAK_LF
@@ -280,3 +328,15 @@ def _get_category(char_code: int) -> CharBoundaryCategory:
         return CharBoundaryCategory.SEPARATOR
 
     return CharBoundaryCategory.OTHER
+
+
+_CATEGORY_BY_BYTE = bytes(_get_category(c) for c in range(128)) + bytes(
+    [CharBoundaryCategory.OTHER] * 128
+)
+_CATEGORY_COUNT = len(CharBoundaryCategory)
+_END_CATEGORY = bytes([CharBoundaryCategory.END])
+_BOUNDARY_SCORES = [
+    _get_boundary_score(prev_category, next_category)
+    for prev_category in CharBoundaryCategory
+    for next_category in CharBoundaryCategory
+]
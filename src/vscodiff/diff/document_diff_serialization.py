@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from array import array
+
+from vscodiff.common.line_range import LineRange
+from vscodiff.common.range import Range
+from vscodiff.diff.document_diff_provider import DocumentDiff
+from vscodiff.diff.lines_diff_computer import MovedText
+from vscodiff.diff.range_mapping import (
+    DetailedLineRangeMapping,
+    LineRangeMapping,
+    RangeMapping,
+)
+
+FORMAT_VERSION = 1
+
+# Documents are encoded as a flat list of signed 32-bit integers:
+#   version, identical, quit_early, change count, changes..., move count, moves...
+# A change is its original and modified line ranges followed by the number of
+# inner changes (-1 for None) and 8 ints (two ranges) per inner change. A move
+# is its line range mapping followed by a change count and its changes.
+_NO_INNER_CHANGES = -1
+
+
+def serialize_document_diff(diff: DocumentDiff) -> bytes:
+    values = array("i", [FORMAT_VERSION, int(diff.identical), int(diff.quit_early)])
+    _write_changes(values, diff.changes)
+
+    values.append(len(diff.moves))
+    for move in diff.moves:
+        _write_line_range_mapping(values, move.line_range_mapping)
+        _write_changes(values, move.changes)
+
+    return values.tobytes()
+
+
+def deserialize_document_diff(data: bytes) -> DocumentDiff:
+    values = array("i")
+    values.frombytes(data)
+    if len(values) < 3 or values[0] != FORMAT_VERSION:
+        raise ValueError("Unsupported serialized DocumentDiff format")
+
+    reader = _Reader(values, 3)
+    changes = reader.read_changes()
+
+    moves: list[MovedText] = []
+    for _ in range(reader.read()):
+        original, modified = reader.read_line_range(), reader.read_line_range()
+        moves.append(
+            MovedText(LineRangeMapping(original, modified), reader.read_changes())
+        )
+
+    return DocumentDiff(
+        identical=bool(values[1]),
+        quit_early=bool(values[2]),
+        changes=changes,
+        moves=moves,
+    )
+
+
+def _write_line_range_mapping(values: array[int], mapping: LineRangeMapping) -> None:
+    values.extend(
+        (
+            mapping.original.start_line,
+            mapping.original.end_line_exclusive,
+            mapping.modified.start_line,
+            mapping.modified.end_line_exclusive,
+        )
+    )
+
+
+def _write_range(values: array[int], range_: Range) -> None:
+    values.extend(
+        (
+            range_.start_line,
+            range_.start_column,
+            range_.end_line,
+            range_.end_column,
+        )
+    )
+
+
+def _write_changes(values: array[int], changes: list[DetailedLineRangeMapping]) -> None:
+    values.append(len(changes))
+    for change in changes:
+        _write_line_range_mapping(values, change)
+        if change.inner_changes is None:
+            values.append(_NO_INNER_CHANGES)
+            continue
+
+        values.append(len(change.inner_changes))
+        for inner in change.inner_changes:
+            _write_range(values, inner.original_range)
+            _write_range(values, inner.modified_range)
+
+
+class _Reader:
+    def __init__(self, values: array[int], offset: int):
+        self._values = values
+        self._offset = offset
+
+    def read(self) -> int:
+        if self._offset >= len(self._values):
+            raise ValueError("Truncated serialized DocumentDiff")
+
+        value = self._values[self._offset]
+        self._offset += 1
+        return value
+
+    def read_line_range(self) -> LineRange:
+        return LineRange(self.read(), self.read())
+
+    def read_range(self) -> Range:
+        return Range(self.read(), self.read(), self.read(), self.read())
+
+    def read_changes(self) -> list[DetailedLineRangeMapping]:
+        changes: list[DetailedLineRangeMapping] = []
+        for _ in range(self.read()):
+            original, modified = self.read_line_range(), self.read_line_range()
+            inner_count = self.read()
+            inner_changes = (
+                None
+                if inner_count == _NO_INNER_CHANGES
+                else [
+                    RangeMapping(self.read_range(), self.read_range())
+                    for _ in range(inner_count)
+                ]
+            )
+            changes.append(DetailedLineRangeMapping(original, modified, inner_changes))
+
+        return changes
@@ -23,6 +23,12 @@ class LinesDiffComputerOptions(NamedTuple):
     max_computation_time_ms: int
     compute_moves: bool
     extend_to_subwords: bool | None
+    # Per-phase time budgets in milliseconds (0 for no limit). A phase with a
+    # budget gets its own timeout, started when the phase starts, instead of
+    # sharing ``max_computation_time_ms`` with the other phases.
+    line_alignment_time_ms: int | None = None
+    char_refinement_time_ms: int | None = None
+    moves_time_ms: int | None = None
 
 
 @dataclass
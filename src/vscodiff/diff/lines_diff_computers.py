@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+    DiffAlgorithm,
+)
+from vscodiff.diff.default_lines_diff_computer.algorithms.histogram_diff_algorithm import (
+    HistogramDiffAlgorithm,
+)
 from vscodiff.diff.default_lines_diff_computer.default_lines_diff_computer import (
     DefaultLineDiffComputer,
 )
@@ -13,8 +19,20 @@ class LinesDiffComputers:
         return LegacyLinesDiffComputer()
 
     @staticmethod
-    def get_default() -> LinesDiffComputer:
-        return DefaultLineDiffComputer()
+    def get_default(
+        perfect_hashes: dict[str, int] | None = None,
+        char_diff_algorithm: DiffAlgorithm | None = None,
+    ) -> LinesDiffComputer:
+        return DefaultLineDiffComputer(perfect_hashes, char_diff_algorithm)
+
+    @staticmethod
+    def get_histogram(
+        perfect_hashes: dict[str, int] | None = None,
+        char_diff_algorithm: DiffAlgorithm | None = None,
+    ) -> LinesDiffComputer:
+        return DefaultLineDiffComputer(
+            perfect_hashes, char_diff_algorithm, HistogramDiffAlgorithm()
+        )
 
 
 lines_diff_computers = LinesDiffComputers()
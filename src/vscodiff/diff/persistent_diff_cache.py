@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from vscodiff.diff.document_diff_provider import DocumentDiff
+from vscodiff.diff.document_diff_serialization import (
+    FORMAT_VERSION,
+    deserialize_document_diff,
+    serialize_document_diff,
+)
+
+# Bump whenever a change to the diff algorithms changes their results, so that
+# databases written by older versions are not served after an upgrade.
+ALGORITHM_VERSION = 1
+
+_SCHEMA_VERSION = FORMAT_VERSION << 16 | ALGORITHM_VERSION
+
+
+class PersistentDiffCache:
+    """SQLite-backed store of serialized ``DocumentDiff`` results.
+
+    The database runs in WAL mode, so several processes on the same machine can
+    read and write it concurrently. Each thread uses its own connection. When
+    ``max_entries`` is set, the oldest entries are pruned as new ones arrive.
+
+    The database is cleared when it was written with another serialization
+    format or ``ALGORITHM_VERSION``, and keys are prefixed with both, so
+    processes running different versions never read each other's results.
+
+    The cache never fails a diff: when the database is locked for longer than
+    ``busy_timeout_ms``, corrupt or unwritable, reads are misses and writes are
+    skipped.
+    """
+
+    PRUNE_INTERVAL = 64
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int | None = None,
+        busy_timeout_ms: int = 5000,
+    ):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self._path = path
+        self._max_entries = max_entries
+        self._busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._puts_since_prune = 0
+        self._prune_lock = threading.Lock()
+
+        connection = self._connection()
+        with connection:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != (
+                _SCHEMA_VERSION
+            ):
+                connection.execute("DROP TABLE IF EXISTS diffs")
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS diffs "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path, timeout=self._busy_timeout_ms / 1000
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+
+        return connection
+
+    def get(self, key: str) -> DocumentDiff | None:
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT value FROM diffs WHERE key = ?", (_versioned(key),))
+                .fetchone()
+            )
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        try:
+            return deserialize_document_diff(row[0])
+        except ValueError:
+            return None
+
+    def put(self, key: str, value: DocumentDiff) -> None:
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO diffs (key, value) VALUES (?, ?)",
+                    (_versioned(key), serialize_document_diff(value)),
+                )
+        except sqlite3.Error:
+            return
+
+        if self._max_entries is None:
+            return
+
+        with self._prune_lock:
+            self._puts_since_prune += 1
+            should_prune = self._puts_since_prune >= self.PRUNE_INTERVAL
+            if should_prune:
+                self._puts_since_prune = 0
+
+        if should_prune:
+            self._prune(connection, self._max_entries)
+
+    def _prune(self, connection: sqlite3.Connection, max_entries: int) -> None:
+        try:
+            with connection:
+                connection.execute(
+                    "DELETE FROM diffs WHERE rowid NOT IN "
+                    "(SELECT rowid FROM diffs ORDER BY rowid DESC LIMIT ?)",
+                    (max_entries,),
+                )
+        except sqlite3.Error:
+            # Pruning is retried after the next PRUNE_INTERVAL writes.
+            return
+
+    def clear(self) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM diffs")
+
+    def size(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM diffs").fetchone()[0]
+
+    def close(self) -> None:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def _versioned(key: str) -> str:
+    return f"{FORMAT_VERSION}.{ALGORITHM_VERSION}:{key}"
@@ -1,26 +1,59 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, replace
-from typing import Literal
+import hashlib
+import sys
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import astuple, dataclass, field, replace
+from typing import Iterable, Literal, cast
 
-from vscodiff.common.cache import LRUCache
+from vscodiff.common.cache import CacheStats, LRUCache, ShardedLRUCache
 from vscodiff.common.line_range import LineRange
+from vscodiff.common.position import Position
 from vscodiff.common.range import Range
 from vscodiff.common.strings import split_lines
+from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+    BitParallelLcsDiffing,
+)
 from vscodiff.diff.document_diff_provider import (
     DocumentDiff,
     DocumentDiffProviderOptions,
 )
-from vscodiff.diff.lines_diff_computer import LinesDiffComputerOptions
+from vscodiff.diff.document_diff_serialization import (
+    deserialize_document_diff,
+    serialize_document_diff,
+)
+from vscodiff.diff.lines_diff_computer import (
+    LinesDiffComputer,
+    LinesDiffComputerOptions,
+    MovedText,
+)
 from vscodiff.diff.lines_diff_computers import lines_diff_computers
-from vscodiff.diff.range_mapping import DetailedLineRangeMapping, RangeMapping
+from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+from vscodiff.diff.range_mapping import (
+    DetailedLineRangeMapping,
+    LineRangeMapping,
+    RangeMapping,
+)
 
-DiffAlgorithmName = Literal["legacy", "advanced"]
+DiffAlgorithmName = Literal["legacy", "advanced", "histogram"]
+CharDiffAlgorithmName = Literal["default", "bit-parallel"]
 
 
 @dataclass
 class DiffOptions(DocumentDiffProviderOptions):
     diff_algorithm: DiffAlgorithmName = "advanced"
+    char_diff_algorithm: CharDiffAlgorithmName = "default"
+    """character-level refinement of changed regions: ``"default"`` picks dynamic
+    programming or Myers by size, ``"bit-parallel"`` uses ``BitParallelLcsDiffing``
+    for every region; ignored by the legacy algorithm"""
+    line_alignment_time_ms: int | None = None
+    """own time budget for aligning lines (0 for no limit) instead of a share of
+    ``max_computation_time_ms``; ignored by the legacy algorithm"""
+    char_refinement_time_ms: int | None = None
+    """own time budget for the character-level diffs of all changed regions"""
+    moves_time_ms: int | None = None
+    """own time budget for move detection"""
 
 
 @dataclass
@@ -35,10 +68,25 @@ class VSCDiffOptions:
         )
     )
     cache_size: int = 100
+    cache_max_bytes: int | None = None
+    """when set, the cache is bounded by the estimated size of its results in
+    bytes instead of by ``cache_size`` entries"""
+    cache_shards: int = 1
+    """number of independently locked cache shards; use more than one when many
+    threads share a ``VSCDiff`` so cache lookups do not contend on one lock.
+    Each shard gets an equal part of the capacity, so with ``cache_max_bytes`` a
+    result larger than ``cache_max_bytes / cache_shards`` is never cached"""
+    persistent_cache_path: str | None = None
+    """SQLite database that keeps results across restarts and shares them between
+    processes; results that hit the timeout are not persisted"""
+    persistent_cache_max_entries: int | None = 10_000
+    """number of results kept in the persistent cache, oldest first out (``None``
+    for no limit)"""
 
 
 class VSCDiff:
     DEFAULT_CACHE_SIZE = 100
+    CONTENT_KEY_DIGEST_SIZE = 16
     DEFAULT_DIFF_OPTIONS = DiffOptions(
         ignore_trim_whitespace=True,
         max_computation_time_ms=1000,
@@ -56,28 +104,63 @@ class VSCDiff:
         else:
             self._options = options
 
-        self._diff_cache: LRUCache[str, DocumentDiff] = LRUCache(
-            self._options.cache_size
+        if self._options.cache_max_bytes is not None:
+            capacity = self._options.cache_max_bytes
+            weigher = estimate_document_diff_size
+        else:
+            capacity = self._options.cache_size
+            weigher = None
+
+        if self._options.cache_shards > 1:
+            self._diff_cache: (
+                LRUCache[str, DocumentDiff] | ShardedLRUCache[str, DocumentDiff]
+            ) = ShardedLRUCache(capacity, self._options.cache_shards, weigher)
+        else:
+            self._diff_cache = LRUCache(capacity, weigher)
+
+        self._persistent_cache = (
+            PersistentDiffCache(
+                self._options.persistent_cache_path,
+                self._options.persistent_cache_max_entries,
+            )
+            if self._options.persistent_cache_path is not None
+            else None
         )
 
-    def _get_diff_algorithm(self, name: DiffAlgorithmName | None = None):
-        if name == "legacy":
-            return lines_diff_computers.get_legacy()
+        # Computations in progress, so that concurrent callers asking for the
+        # same diff wait for the first one instead of computing it again.
+        self._in_flight: dict[str, Future[DocumentDiff]] = {}
+        self._in_flight_lock = threading.Lock()
 
-        return lines_diff_computers.get_default()
+    def get_cache_stats(self) -> CacheStats:
+        return self._diff_cache.stats()
+
+    def _get_diff_algorithm(
+        self,
+        name: DiffAlgorithmName | None = None,
+        perfect_hashes: dict[str, int] | None = None,
+        char_name: CharDiffAlgorithmName = "default",
+    ) -> LinesDiffComputer:
+        return _create_diff_algorithm(name, perfect_hashes, char_name)
 
     def _get_full_range(self, lines: list[str]) -> Range:
         return Range(1, 1, len(lines) + 1, len(lines[-1]) + 1)
 
     def get_content_key(self, content: str) -> str:
-        return content
+        return hashlib.blake2b(
+            content.encode("utf-8", "surrogatepass"),
+            digest_size=self.CONTENT_KEY_DIGEST_SIZE,
+        ).hexdigest()
 
-    def _get_diff_cache_key(self, original: str, modified: str) -> str:
-        return (
-            f"{self.get_content_key(original)}"
-            f"-vscdiff-cache-key-"
-            f"{self.get_content_key(modified)}"
-        )
+    def _get_options_key(self, options: DiffOptions) -> str:
+        return ":".join(str(value) for value in astuple(options))
+
+    def get_diff_cache_key(
+        self, original_key: str, modified_key: str, options: DiffOptions
+    ) -> str:
+        """Key of a diff in the caches, from the ``get_content_key`` of both
+        documents and the options."""
+        return f"{original_key}-{modified_key}-{self._get_options_key(options)}"
 
     def compute_diff(
         self,
@@ -85,18 +168,139 @@ class VSCDiff:
         modified: str,
         options: DiffOptions | None = None,
     ) -> DocumentDiff:
-        original_lines = split_lines(original)
-        modified_lines = split_lines(modified)
-
-        if len(original_lines) == 1 and len(original_lines[0]) == 0:
-            if len(modified_lines) == 1 and len(modified_lines[0]) == 0:
-                return DocumentDiff(
-                    identical=True,
-                    quit_early=False,
-                    changes=[],
-                    moves=[],
+        diff_options = options if options is not None else self._options.diff_options
+        return self._compute_diff(original, modified, diff_options, None)
+
+    def compute_diffs(
+        self,
+        pairs: Iterable[tuple[str, str]],
+        options: DiffOptions | None = None,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+    ) -> list[DocumentDiff]:
+        """Diff many ``(original, modified)`` pairs, returning results in order.
+
+        Identical and cached pairs are answered without running the diff
+        algorithm. The remaining pairs share one diff computer and its line
+        interning table, unless ``max_workers`` > 1 or an ``executor`` is given:
+        then they are spread over a process pool (or the given executor),
+        largest pairs first, and results come back serialized.
+        """
+        diff_options = options if options is not None else self._options.diff_options
+        if executor is None and (max_workers is None or max_workers <= 1):
+            diff_algorithm = self._get_diff_algorithm(
+                diff_options.diff_algorithm, {}, diff_options.char_diff_algorithm
+            )
+            return [
+                self._compute_diff(original, modified, diff_options, diff_algorithm)
+                for original, modified in pairs
+            ]
+
+        pairs = list(pairs)
+        results: list[DocumentDiff | None] = [None] * len(pairs)
+        pending: dict[str, list[int]] = {}
+        for i, (original, modified) in enumerate(pairs):
+            known_result, cache_key = self._get_known_diff(
+                original, modified, diff_options
+            )
+            if known_result is not None:
+                results[i] = known_result
+            else:
+                pending.setdefault(cache_key, []).append(i)
+
+        def pair_size(cache_key: str) -> int:
+            original, modified = pairs[pending[cache_key][0]]
+            return len(original) + len(modified)
+
+        if pending:
+            owns_executor = executor is None
+            if executor is None:
+                executor = ProcessPoolExecutor(min(max_workers or 1, len(pending)))
+
+            try:
+                futures = {
+                    cache_key: executor.submit(
+                        _compute_serialized_diff,
+                        *pairs[pending[cache_key][0]],
+                        diff_options,
+                    )
+                    for cache_key in sorted(pending, key=pair_size, reverse=True)
+                }
+                for cache_key, future in futures.items():
+                    result = deserialize_document_diff(future.result())
+                    self._store_diff(cache_key, result)
+                    for i in pending[cache_key]:
+                        results[i] = result
+            finally:
+                if owns_executor:
+                    executor.shutdown(cancel_futures=True)
+
+        # Every pair was either known or pending, so every slot is filled.
+        assert all(result is not None for result in results)
+        return cast(list[DocumentDiff], results)
+
+    def _compute_diff(
+        self,
+        original: str,
+        modified: str,
+        diff_options: DiffOptions,
+        diff_algorithm: LinesDiffComputer | None,
+    ) -> DocumentDiff:
+        known_result, cache_key = self._get_known_diff(original, modified, diff_options)
+        if known_result is not None:
+            return known_result
+
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(cache_key)
+            is_owner = in_flight is None
+            if in_flight is None:
+                in_flight = Future()
+                self._in_flight[cache_key] = in_flight
+
+        if not is_owner:
+            return in_flight.result()
+
+        try:
+            # Another caller may have finished this diff between our cache miss
+            # and taking ownership. The miss is already counted.
+            diff_result = self._diff_cache.peek(cache_key)
+            if diff_result is None:
+                if diff_algorithm is None:
+                    diff_algorithm = self._get_diff_algorithm(
+                        diff_options.diff_algorithm,
+                        char_name=diff_options.char_diff_algorithm,
+                    )
+
+                diff_result = _run_diff_algorithm(
+                    diff_algorithm, original, modified, diff_options
                 )
+                self._store_diff(cache_key, diff_result)
+
+            in_flight.set_result(diff_result)
+            return diff_result
+        except BaseException as error:
+            in_flight.set_exception(error)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[cache_key]
+
+    def _get_known_diff(
+        self, original: str, modified: str, diff_options: DiffOptions
+    ) -> tuple[DocumentDiff | None, str]:
+        """Return the result for a trivial or cached pair without diffing, along
+        with the cache key of the pair."""
+        if original == modified:
+            return DocumentDiff(
+                identical=True,
+                quit_early=False,
+                changes=[],
+                moves=[],
+            ), ""
 
+        if len(original) == 0:
+            original_lines = [original]
+            modified_lines = split_lines(modified)
             return DocumentDiff(
                 identical=False,
                 quit_early=False,
@@ -113,30 +317,130 @@ class VSCDiff:
                     ),
                 ],
                 moves=[],
-            )
+            ), ""
 
-        cache_key = self._get_diff_cache_key(original, modified)
+        cache_key = self.get_diff_cache_key(
+            self.get_content_key(original),
+            self.get_content_key(modified),
+            diff_options,
+        )
         cached_result = self._diff_cache.get(cache_key)
         if cached_result is not None:
-            return cached_result
+            return cached_result, cache_key
 
-        diff_options = options if options is not None else self._options.diff_options
-        diff_algorithm = self._get_diff_algorithm(diff_options.diff_algorithm)
-        result = diff_algorithm.compute_diff(
-            original_lines,
-            modified_lines,
-            LinesDiffComputerOptions(
-                ignore_trim_whitespace=diff_options.ignore_trim_whitespace,
-                max_computation_time_ms=diff_options.max_computation_time_ms,
-                compute_moves=diff_options.compute_moves,
-                extend_to_subwords=diff_options.extend_to_subwords,
-            ),
-        )
-        diff_result = DocumentDiff(
-            identical=original == modified,
-            quit_early=result.hit_timeout,
-            changes=result.changes,
-            moves=result.moves,
-        )
+        if self._persistent_cache is not None:
+            cached_result = self._persistent_cache.get(cache_key)
+            if cached_result is not None:
+                self._diff_cache.put(cache_key, cached_result)
+                return cached_result, cache_key
+
+        return None, cache_key
+
+    def _store_diff(self, cache_key: str, diff_result: DocumentDiff) -> None:
         self._diff_cache.put(cache_key, diff_result)
-        return diff_result
+        if self._persistent_cache is not None and not diff_result.quit_early:
+            self._persistent_cache.put(cache_key, diff_result)
+
+
+def _create_diff_algorithm(
+    name: DiffAlgorithmName | None = None,
+    perfect_hashes: dict[str, int] | None = None,
+    char_name: CharDiffAlgorithmName = "default",
+) -> LinesDiffComputer:
+    if name == "legacy":
+        return lines_diff_computers.get_legacy()
+
+    char_diff_algorithm = (
+        BitParallelLcsDiffing() if char_name == "bit-parallel" else None
+    )
+    if name == "histogram":
+        return lines_diff_computers.get_histogram(perfect_hashes, char_diff_algorithm)
+
+    return lines_diff_computers.get_default(perfect_hashes, char_diff_algorithm)
+
+
+def _run_diff_algorithm(
+    diff_algorithm: LinesDiffComputer,
+    original: str,
+    modified: str,
+    diff_options: DiffOptions,
+) -> DocumentDiff:
+    result = diff_algorithm.compute_diff(
+        split_lines(original),
+        split_lines(modified),
+        LinesDiffComputerOptions(
+            ignore_trim_whitespace=diff_options.ignore_trim_whitespace,
+            max_computation_time_ms=diff_options.max_computation_time_ms,
+            compute_moves=diff_options.compute_moves,
+            extend_to_subwords=diff_options.extend_to_subwords,
+            line_alignment_time_ms=diff_options.line_alignment_time_ms,
+            char_refinement_time_ms=diff_options.char_refinement_time_ms,
+            moves_time_ms=diff_options.moves_time_ms,
+        ),
+    )
+    return DocumentDiff(
+        identical=False,
+        quit_early=result.hit_timeout,
+        changes=result.changes,
+        moves=result.moves,
+    )
+
+
+def _compute_serialized_diff(
+    original: str, modified: str, diff_options: DiffOptions
+) -> bytes:
+    # Runs in worker processes; the serialized form keeps the result IPC small.
+    diff_algorithm = _create_diff_algorithm(
+        diff_options.diff_algorithm, char_name=diff_options.char_diff_algorithm
+    )
+    return serialize_document_diff(
+        _run_diff_algorithm(diff_algorithm, original, modified, diff_options)
+    )
+
+
+def _object_size(obj: object) -> int:
+    return sys.getsizeof(obj) + sys.getsizeof(vars(obj))
+
+
+_LIST_SIZE = sys.getsizeof([])
+_POINTER_SIZE = (sys.getsizeof([None]) - _LIST_SIZE) or 8
+_POSITION_SIZE = _object_size(Position(1, 1))
+_RANGE_SIZE = _object_size(Range(1, 1, 1, 1)) + 2 * _POSITION_SIZE
+_RANGE_MAPPING_SIZE = (
+    _object_size(RangeMapping(Range(1, 1, 1, 1), Range(1, 1, 1, 1))) + 2 * _RANGE_SIZE
+)
+_LINE_RANGE_SIZE = _object_size(LineRange(1, 1))
+_DETAILED_MAPPING_SIZE = (
+    _object_size(DetailedLineRangeMapping(LineRange(1, 1), LineRange(1, 1), []))
+    + 2 * _LINE_RANGE_SIZE
+    + _LIST_SIZE
+)
+_LINE_RANGE_MAPPING_SIZE = (
+    _object_size(LineRangeMapping(LineRange(1, 1), LineRange(1, 1)))
+    + 2 * _LINE_RANGE_SIZE
+)
+_MOVED_TEXT_SIZE = (
+    _object_size(MovedText(LineRangeMapping(LineRange(1, 1), LineRange(1, 1)), []))
+    + _LINE_RANGE_MAPPING_SIZE
+    + _LIST_SIZE
+)
+_DOCUMENT_DIFF_SIZE = _object_size(DocumentDiff(True, False)) + 2 * _LIST_SIZE
+
+
+def _estimate_changes_size(changes: list[DetailedLineRangeMapping]) -> int:
+    size = len(changes) * (_DETAILED_MAPPING_SIZE + _POINTER_SIZE)
+    for change in changes:
+        if change.inner_changes is not None:
+            size += len(change.inner_changes) * (_RANGE_MAPPING_SIZE + _POINTER_SIZE)
+
+    return size
+
+
+def estimate_document_diff_size(diff: DocumentDiff) -> int:
+    """Approximate memory footprint of ``diff`` in bytes, including its changes,
+    their inner range mappings and its moves."""
+    size = _DOCUMENT_DIFF_SIZE + _estimate_changes_size(diff.changes)
+    for move in diff.moves:
+        size += _MOVED_TEXT_SIZE + _POINTER_SIZE + _estimate_changes_size(move.changes)
+
+    return size
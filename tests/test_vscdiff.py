@@ -17,6 +17,9 @@ from vscodiff.common.diff.diff import (
     string_diff,
 )
 from vscodiff.common.diff.diff_change import DiffChange, DiffResult
+from vscodiff.common.range import Range
+from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import Timeout
+from vscodiff.diff.model import GetValueOptions, TextModel
 
 
 # ---------------------------------------------------------------------------
@@ -367,6 +370,50 @@ class TestVSCDiff:
         r2 = vsdiff.compute_diff("abc", "abd")  # cache hit
         assert len(r1.changes) == len(r2.changes)
 
+    def test_content_key_is_fixed_size_digest(self):
+        vsdiff = self.VSCDiff()
+        small = vsdiff.get_content_key("abc")
+        large = vsdiff.get_content_key("abc\n" * 100_000)
+        assert len(small) == len(large) == 2 * self.VSCDiff.CONTENT_KEY_DIGEST_SIZE
+        assert small == vsdiff.get_content_key("abc")
+        assert small != vsdiff.get_content_key("abd")
+
+    def test_cache_hit_returns_same_result(self):
+        vsdiff = self.VSCDiff()
+        original = "line\n" * 1000 + "tail"
+        r1 = vsdiff.compute_diff(original, original + "!")
+        r2 = vsdiff.compute_diff(original, original + "!")
+        assert r1 is r2
+
+    def test_cache_key_includes_options(self):
+        from vscodiff.engine import DiffOptions
+
+        vsdiff = self.VSCDiff()
+        original = "a\n  b\nc"
+        modified = "a\n\tb\nc"
+        ignoring = vsdiff.compute_diff(
+            original, modified, DiffOptions(ignore_trim_whitespace=True)
+        )
+        considering = vsdiff.compute_diff(
+            original, modified, DiffOptions(ignore_trim_whitespace=False)
+        )
+        assert ignoring.changes == []
+        assert len(considering.changes) == 1
+        assert (
+            vsdiff.compute_diff(
+                original, modified, DiffOptions(ignore_trim_whitespace=True)
+            )
+            is ignoring
+        )
+
+        original_key = vsdiff.get_content_key(original)
+        modified_key = vsdiff.get_content_key(modified)
+        assert vsdiff.get_diff_cache_key(
+            original_key, modified_key, DiffOptions(ignore_trim_whitespace=True)
+        ) != vsdiff.get_diff_cache_key(
+            original_key, modified_key, DiffOptions(ignore_trim_whitespace=False)
+        )
+
     def test_with_legacy_algorithm(self):
         from vscodiff.engine import DiffOptions
 
@@ -381,6 +428,65 @@ class TestVSCDiff:
         assert result is not None
         assert len(result.changes) > 0
 
+    def test_phase_time_budgets(self, monkeypatch):
+        from vscodiff.diff.default_lines_diff_computer import (
+            default_lines_diff_computer,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+            InfiniteTimeout,
+        )
+        from vscodiff.engine import DiffOptions
+
+        monkeypatch.setattr(
+            default_lines_diff_computer,
+            "_create_timeout",
+            lambda time_ms: (
+                _CountdownTimeout(0) if time_ms == 1 else InfiniteTimeout.instance
+            ),
+        )
+        vsdiff = self.VSCDiff()
+        shared = DiffOptions(max_computation_time_ms=1)
+        split = DiffOptions(
+            max_computation_time_ms=1,
+            line_alignment_time_ms=100,
+            char_refinement_time_ms=100,
+        )
+        assert vsdiff.compute_diff("a\nb", "a\nc", shared).quit_early
+        assert not vsdiff.compute_diff("a\nb", "a\nc", split).quit_early
+
+    def test_char_diff_algorithm(self, monkeypatch):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+            BitParallelLcsDiffing,
+        )
+        from vscodiff.engine import DiffOptions
+
+        calls = []
+        compute = BitParallelLcsDiffing.compute
+
+        def counting_compute(self, *args):
+            calls.append(args)
+            return compute(self, *args)
+
+        monkeypatch.setattr(BitParallelLcsDiffing, "compute", counting_compute)
+        vsdiff = self.VSCDiff()
+        original = "def f(a):\n    return a\n"
+        modified = "def f(b):\n    return b + 1\n"
+        default = vsdiff.compute_diff(original, modified, DiffOptions())
+        assert calls == []
+
+        for diff_algorithm in ("advanced", "histogram"):
+            bit_parallel = vsdiff.compute_diff(
+                original,
+                modified,
+                DiffOptions(
+                    diff_algorithm=diff_algorithm, char_diff_algorithm="bit-parallel"
+                ),
+            )
+            assert calls
+            assert bit_parallel is not default
+            assert bit_parallel == default
+            calls.clear()
+
     def test_vscdiff_options_constructor(self):
         from vscodiff.engine import VSCDiffOptions, DiffOptions
 
@@ -395,6 +501,65 @@ class TestVSCDiff:
         result = vsdiff.compute_diff("abc", "abd")
         assert result is not None
 
+    def test_compute_diffs_matches_compute_diff(self):
+        pairs = [
+            ("one\ntwo\nthree", "one\n2\nthree"),
+            ("same\ntext", "same\ntext"),
+            ("", "added"),
+            ("a\nb\nc\nd", "a\nc\nb\nd"),
+            ("one\ntwo\nthree", "one\n2\nthree"),
+        ]
+        results = self.VSCDiff().compute_diffs(pairs)
+        expected = [self.VSCDiff().compute_diff(o, m) for o, m in pairs]
+        assert results == expected
+        assert results[1].identical is True
+        assert results[4] is results[0]
+
+    def test_compute_diffs_in_process_pool(self):
+        pairs = [
+            ("x\n" * 50 + "end", "x\n" * 49 + "y\nend"),
+            ("one\ntwo\nthree", "one\n2\nthree"),
+            ("same", "same"),
+            ("one\ntwo\nthree", "one\n2\nthree"),
+        ]
+        vsdiff = self.VSCDiff()
+        results = vsdiff.compute_diffs(pairs, max_workers=2)
+        assert results == [self.VSCDiff().compute_diff(o, m) for o, m in pairs]
+        assert results[3] is results[1]
+        assert vsdiff.compute_diff(*pairs[0]) is results[0]
+
+    def test_concurrent_identical_requests_compute_once(self, monkeypatch):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        import vscodiff.engine
+
+        calls = 0
+        run_diff_algorithm = vscodiff.engine._run_diff_algorithm
+
+        def slow_run_diff_algorithm(*args):
+            nonlocal calls
+            calls += 1
+            time.sleep(0.05)
+            return run_diff_algorithm(*args)
+
+        monkeypatch.setattr(
+            vscodiff.engine, "_run_diff_algorithm", slow_run_diff_algorithm
+        )
+        vsdiff = self.VSCDiff()
+        start = threading.Barrier(8)
+
+        def compute(_):
+            start.wait()
+            return vsdiff.compute_diff("a\nb\nc", "a\nx\nc")
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(compute, range(8)))
+
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+
     def test_complex_diff_from_ts_suite(self):
         """Port of the TS complex case snapshot test."""
         original = (
@@ -473,6 +638,997 @@ class TestVSCDiff:
         assert len(result.changes) > 0
 
 
+# ---------------------------------------------------------------------------
+# LRUCache
+# ---------------------------------------------------------------------------
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        from vscodiff.common.cache import LRUCache
+
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_weighted_capacity(self):
+        from vscodiff.common.cache import LRUCache
+
+        cache = LRUCache[str, str](10, len)
+        cache.put("a", "xxxx")
+        cache.put("b", "yyyy")
+        cache.put("c", "zzzz")
+        assert cache.size() == 2
+        assert cache.weight() == 8
+        assert cache.get("a") is None
+
+        cache.put("big", "w" * 11)
+        assert cache.get("big") is None
+        assert cache.weight() == 8
+
+    def test_stats(self):
+        from vscodiff.common.cache import CacheStats, LRUCache
+
+        cache: LRUCache[str, int] = LRUCache(1)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        cache.put("b", 2)
+        assert cache.stats() == CacheStats(
+            entries=1, weight=1, hits=1, misses=1, evictions=1
+        )
+
+        assert cache.peek("b") == 2
+        assert cache.peek("c") is None
+        assert cache.stats().hits == 1
+        assert cache.stats().misses == 1
+
+    def test_vscdiff_counts_one_miss_per_cold_diff(self):
+        from vscodiff.engine import VSCDiff, VSCDiffOptions
+
+        for options in (VSCDiffOptions(), VSCDiffOptions(cache_shards=4)):
+            vsdiff = VSCDiff(options)
+            vsdiff.compute_diff("a\nb", "a\nc")
+            stats = vsdiff.get_cache_stats()
+            assert (stats.hits, stats.misses) == (0, 1)
+
+            vsdiff.compute_diff("a\nb", "a\nc")
+            stats = vsdiff.get_cache_stats()
+            assert (stats.hits, stats.misses) == (1, 1)
+
+    def test_sharded_cache(self):
+        from vscodiff.common.cache import ShardedLRUCache
+
+        cache: ShardedLRUCache[int, int] = ShardedLRUCache(8, 4)
+        for i in range(100):
+            cache.put(i, i * i)
+
+        assert cache.size() <= 8
+        assert cache.get(99) == 99 * 99
+        stats = cache.stats()
+        assert stats.entries == cache.size()
+        assert stats.evictions == 100 - cache.size()
+        assert stats.hits == 1
+
+        # Each shard holds at most its part of the budget.
+        weighted = ShardedLRUCache[str, str](10, 2, len)
+        weighted.put("small", "x" * 5)
+        weighted.put("large", "x" * 6)
+        assert weighted.get("small") is not None
+        assert weighted.get("large") is None
+
+    def test_vscdiff_sharded_cache_across_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from vscodiff.engine import VSCDiff, VSCDiffOptions
+
+        vsdiff = VSCDiff(VSCDiffOptions(cache_size=16, cache_shards=4))
+        pairs = [(f"a\n{i % 10}\nc", f"a\n{i % 10}x\nc") for i in range(200)]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda p: vsdiff.compute_diff(*p), pairs))
+
+        assert results[:10] == [VSCDiff().compute_diff(*p) for p in pairs[:10]]
+        assert vsdiff.get_cache_stats().hits > 0
+
+    def test_vscdiff_byte_budget(self):
+        from vscodiff.engine import VSCDiff, VSCDiffOptions, estimate_document_diff_size
+
+        vsdiff = VSCDiff(VSCDiffOptions(cache_max_bytes=1_000_000))
+        result = vsdiff.compute_diff("a\nb\nc", "a\nx\nc")
+        stats = vsdiff.get_cache_stats()
+        assert stats.entries == 1
+        assert stats.weight == estimate_document_diff_size(result) > 0
+
+
+# ---------------------------------------------------------------------------
+# PersistentDiffCache
+# ---------------------------------------------------------------------------
+
+
+class TestPersistentDiffCache:
+    ORIGINAL = "def f():\n    return 1\n\nprint(f())\n"
+    MODIFIED = "def f(x):\n    return x\n\nprint(f(2))\n"
+
+    def test_serialization_round_trip(self):
+        from vscodiff.diff.document_diff_serialization import (
+            deserialize_document_diff,
+            serialize_document_diff,
+        )
+        from vscodiff.common.line_range import LineRange
+        from vscodiff.diff.lines_diff_computer import MovedText
+        from vscodiff.diff.range_mapping import LineRangeMapping
+        from vscodiff.engine import VSCDiff
+
+        result = VSCDiff().compute_diff(self.ORIGINAL, self.MODIFIED)
+        assert result.changes
+        result.moves.append(
+            MovedText(
+                LineRangeMapping(LineRange(1, 3), LineRange(3, 5)), result.changes
+            )
+        )
+        assert deserialize_document_diff(serialize_document_diff(result)) == result
+
+    def test_rejects_unknown_format(self):
+        from vscodiff.diff.document_diff_serialization import (
+            deserialize_document_diff,
+        )
+
+        with pytest.raises(ValueError):
+            deserialize_document_diff(b"\xff\xff\xff\xff")
+
+    def test_shared_between_instances(self, tmp_path):
+        from vscodiff.engine import VSCDiff, VSCDiffOptions
+
+        path = str(tmp_path / "diffs.sqlite")
+        first = VSCDiff(VSCDiffOptions(persistent_cache_path=path))
+        expected = first.compute_diff(self.ORIGINAL, self.MODIFIED)
+
+        second = VSCDiff(VSCDiffOptions(persistent_cache_path=path))
+        second._get_diff_algorithm = None  # type: ignore
+        assert second.compute_diff(self.ORIGINAL, self.MODIFIED) == expected
+
+    def test_prunes_oldest_entries(self, tmp_path):
+        from vscodiff.diff.document_diff_provider import null_document_diff
+        from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+
+        cache = PersistentDiffCache(str(tmp_path / "diffs.sqlite"), max_entries=10)
+        for i in range(PersistentDiffCache.PRUNE_INTERVAL):
+            cache.put(str(i), null_document_diff)
+
+        assert cache.size() == 10
+        assert cache.get("0") is None
+        assert cache.get(str(PersistentDiffCache.PRUNE_INTERVAL - 1)) is not None
+        cache.close()
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        import sqlite3
+
+        from vscodiff.diff.document_diff_serialization import (
+            deserialize_document_diff,
+            serialize_document_diff,
+        )
+        from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+        from vscodiff.engine import VSCDiff
+
+        data = serialize_document_diff(
+            VSCDiff().compute_diff(self.ORIGINAL, self.MODIFIED)
+        )
+        with pytest.raises(ValueError):
+            deserialize_document_diff(data[:-8])
+
+        path = str(tmp_path / "diffs.sqlite")
+        cache = PersistentDiffCache(path)
+        cache.put("key", deserialize_document_diff(data))
+        with sqlite3.connect(path) as connection:
+            connection.execute("UPDATE diffs SET value = ?", (data[:-8],))
+
+        assert cache.get("key") is None
+        cache.close()
+
+    def test_locked_database_does_not_fail_the_diff(self, tmp_path):
+        import sqlite3
+
+        from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+        from vscodiff.engine import VSCDiff, VSCDiffOptions
+
+        path = str(tmp_path / "diffs.sqlite")
+        diff = VSCDiff(VSCDiffOptions(persistent_cache_path=path))
+        diff._persistent_cache = PersistentDiffCache(path, busy_timeout_ms=10)
+        expected = VSCDiff().compute_diff(self.ORIGINAL, self.MODIFIED)
+
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            assert diff.compute_diff(self.ORIGINAL, self.MODIFIED) == expected
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+
+        assert diff._persistent_cache.size() == 0
+
+    def test_unreadable_database_is_a_miss(self, tmp_path):
+        from vscodiff.diff.document_diff_provider import null_document_diff
+        from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+
+        path = tmp_path / "diffs.sqlite"
+        cache = PersistentDiffCache(str(path))
+        cache.close()
+        path.write_bytes(b"not a database" * 1000)
+
+        cache.put("key", null_document_diff)
+        assert cache.get("key") is None
+        cache.close()
+
+    def test_drops_results_of_other_algorithm_versions(self, tmp_path, monkeypatch):
+        from vscodiff.diff import persistent_diff_cache
+        from vscodiff.diff.document_diff_provider import null_document_diff
+        from vscodiff.diff.persistent_diff_cache import PersistentDiffCache
+
+        path = str(tmp_path / "diffs.sqlite")
+        cache = PersistentDiffCache(path)
+        cache.put("key", null_document_diff)
+        cache.close()
+
+        version = persistent_diff_cache.ALGORITHM_VERSION + 1
+        monkeypatch.setattr(persistent_diff_cache, "ALGORITHM_VERSION", version)
+        monkeypatch.setattr(
+            persistent_diff_cache,
+            "_SCHEMA_VERSION",
+            persistent_diff_cache._SCHEMA_VERSION + 1,
+        )
+        cache = PersistentDiffCache(path)
+        assert cache.size() == 0
+        cache.close()
+
+    def test_vscdiff_bounds_the_database(self, tmp_path):
+        from vscodiff.engine import VSCDiff, VSCDiffOptions
+
+        path = str(tmp_path / "diffs.sqlite")
+        diff = VSCDiff(
+            VSCDiffOptions(persistent_cache_path=path, persistent_cache_max_entries=3)
+        )
+        assert diff._persistent_cache is not None
+        for i in range(diff._persistent_cache.PRUNE_INTERVAL):
+            diff.compute_diff(self.ORIGINAL, self.MODIFIED + str(i))
+
+        assert diff._persistent_cache.size() == 3
+
+
+# ---------------------------------------------------------------------------
+# AsyncDocumentDiffProvider
+# ---------------------------------------------------------------------------
+
+
+class _StringTextModel(TextModel):
+    def __init__(self, text: str):
+        self._lines = text.split("\n")
+
+    @property
+    def uri(self) -> str:
+        return "inmemory://model"
+
+    @property
+    def id(self) -> str:
+        return "model"
+
+    def get_lines_content(self) -> list[str]:
+        return self._lines
+
+    def get_value(self, options: GetValueOptions | None = None) -> str:
+        return "\n".join(self._lines)
+
+    def get_line_count(self) -> int:
+        return len(self._lines)
+
+    def get_line_max_column(self, line_number: int) -> int:
+        return len(self._lines[line_number - 1]) + 1
+
+    def get_full_model_range(self) -> Range:
+        return Range(1, 1, len(self._lines), len(self._lines[-1]) + 1)
+
+
+class TestAsyncDocumentDiffProvider:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        import threading
+
+        from vscodiff.engine import VSCDiff
+
+        class BlockingVSCDiff(VSCDiff):
+            def __init__(self):
+                super().__init__()
+                self.calls = 0
+                self.release = threading.Event()
+
+            def compute_diff(self, original, modified, options=None):
+                self.calls += 1
+                self.release.wait(5)
+                return super().compute_diff(original, modified, options)
+
+        self.diff = BlockingVSCDiff()
+
+    def _run(self, coro):
+        import asyncio
+
+        return asyncio.run(coro)
+
+    def test_compute_diff(self):
+        from vscodiff.async_provider import AsyncDocumentDiffProvider
+        from vscodiff.engine import DiffOptions, VSCDiff
+
+        provider = AsyncDocumentDiffProvider(self.diff)
+        self.diff.release.set()
+        result = self._run(
+            provider.compute_diff(
+                _StringTextModel("a\nb"), _StringTextModel("a\nc"), DiffOptions()
+            )
+        )
+        assert result == VSCDiff().compute_diff("a\nb", "a\nc", DiffOptions())
+
+    def test_coalesces_identical_requests(self):
+        import asyncio
+
+        from vscodiff.async_provider import AsyncDocumentDiffProvider
+        from vscodiff.engine import DiffOptions
+
+        provider = AsyncDocumentDiffProvider(self.diff)
+
+        async def main():
+            requests = [
+                asyncio.create_task(
+                    provider.compute_diff(
+                        _StringTextModel("a\nb"),
+                        _StringTextModel("a\nc"),
+                        DiffOptions(),
+                    )
+                )
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0.05)
+            self.diff.release.set()
+            return await asyncio.gather(*requests)
+
+        results = self._run(main())
+        assert self.diff.calls == 1
+        assert all(r is results[0] for r in results)
+
+    def test_dispose_raises_cancellation_error(self):
+        import asyncio
+
+        from vscodiff.async_provider import AsyncDocumentDiffProvider
+        from vscodiff.common.errors import CancellationError
+        from vscodiff.engine import DiffOptions
+
+        provider = AsyncDocumentDiffProvider(self.diff)
+
+        async def main():
+            request = asyncio.create_task(
+                provider.compute_diff(
+                    _StringTextModel("a"), _StringTextModel("b"), DiffOptions()
+                )
+            )
+            await asyncio.sleep(0.05)
+            provider.dispose()
+            try:
+                with pytest.raises(CancellationError):
+                    await request
+                with pytest.raises(CancellationError):
+                    await provider.compute_diff(
+                        _StringTextModel("a"), _StringTextModel("b"), DiffOptions()
+                    )
+            finally:
+                self.diff.release.set()
+
+        self._run(main())
+
+
+# ---------------------------------------------------------------------------
+# DefaultLineDiffComputer
+# ---------------------------------------------------------------------------
+
+
+class TestDefaultLineDiffComputer:
+    def _compute(self, original: list[str], modified: list[str]):
+        from vscodiff.diff.default_lines_diff_computer.default_lines_diff_computer import (
+            DefaultLineDiffComputer,
+        )
+        from vscodiff.diff.lines_diff_computer import LinesDiffComputerOptions
+
+        return DefaultLineDiffComputer().compute_diff(
+            original, modified, LinesDiffComputerOptions(True, 0, False, False)
+        )
+
+    def test_moves(self):
+        from vscodiff.diff.default_lines_diff_computer.default_lines_diff_computer import (
+            DefaultLineDiffComputer,
+        )
+        from vscodiff.diff.lines_diff_computer import LinesDiffComputerOptions
+
+        lines = [f"    statement_{i}(argument_{i}, other);" for i in range(40)]
+        options = LinesDiffComputerOptions(True, 0, True, False)
+
+        # A block moved out of a changed region; the move is extended by one
+        # similar line.
+        modified = (
+            lines[:10]
+            + ["new first line", "new second line"]
+            + lines[25:35]
+            + lines[10:25]
+            + ["changed"]
+            + lines[36:]
+        )
+        result = DefaultLineDiffComputer().compute_diff(lines, modified, options)
+        assert [
+            (str(m.line_range_mapping.original), str(m.line_range_mapping.modified))
+            for m in result.moves
+        ] == [("[26, 37)", "[13, 24)")]
+
+        # A block moved up, found by matching the deletion to the insertion.
+        modified = lines[20:30] + lines[:20] + lines[30:]
+        result = DefaultLineDiffComputer().compute_diff(lines, modified, options)
+        assert [
+            (str(m.line_range_mapping.original), str(m.line_range_mapping.modified))
+            for m in result.moves
+        ] == [("[21, 31)", "[1, 11)")]
+
+        # Extending a move compares a line with one of only whitespace.
+        original = ["x", "", "  ", "", "ddd", "", "", "ccc", "ddd"]
+        modified = ["ccc", "", "ddd", "ddd", "", "", "x", "  ", ""]
+        result = DefaultLineDiffComputer().compute_diff(original, modified, options)
+        assert result.changes
+
+    def test_phase_time_budgets(self, monkeypatch):
+        from vscodiff.diff.default_lines_diff_computer import (
+            default_lines_diff_computer,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+            InfiniteTimeout,
+        )
+        from vscodiff.diff.lines_diff_computer import LinesDiffComputerOptions
+
+        # A 1 ms budget is already used up, any other budget never runs out.
+        monkeypatch.setattr(
+            default_lines_diff_computer,
+            "_create_timeout",
+            lambda time_ms: (
+                _CountdownTimeout(0) if time_ms == 1 else InfiniteTimeout.instance
+            ),
+        )
+        original = ["a", "hello world", "b", "c"]
+        modified = ["a", "hello wurld", "b", "d"]
+        expected = self._compute(original, modified)
+
+        def compute(**budgets):
+            return default_lines_diff_computer.DefaultLineDiffComputer().compute_diff(
+                original,
+                modified,
+                LinesDiffComputerOptions(True, 1, False, False, **budgets),
+            )
+
+        assert compute().hit_timeout
+        assert compute(line_alignment_time_ms=0).hit_timeout
+        result = compute(line_alignment_time_ms=0, char_refinement_time_ms=5)
+        assert not result.hit_timeout
+        assert result.changes == expected.changes
+
+        # Without its own budget, character refinement still shares the
+        # exhausted one and falls back to coarse changes for each hunk.
+        coarse = compute(line_alignment_time_ms=0)
+        assert [(c.original, c.modified) for c in coarse.changes] == [
+            (c.original, c.modified) for c in expected.changes
+        ]
+
+    def test_inner_insertion(self):
+        result = self._compute(["hello world"], ["hello there world"])
+        assert len(result.changes) == 1
+        assert [
+            (str(m.original_range), str(m.modified_range))
+            for m in result.changes[0].inner_changes or []
+        ] == [("[1, 6 -> 1, 6]", "[1, 6 -> 1, 12]")]
+
+
+# ---------------------------------------------------------------------------
+# compute_moved_lines
+# ---------------------------------------------------------------------------
+
+
+class TestComputeMovedLines:
+    def test_deletions_to_insertions_match_all_pairs_comparison(self):
+        import random
+
+        from vscodiff.common.line_range import LineRange
+        from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+            InfiniteTimeout,
+        )
+        from vscodiff.diff.default_lines_diff_computer.compute_moved_lines import (
+            _compute_moves_from_simple_deletions_to_simple_insertions,
+        )
+        from vscodiff.diff.default_lines_diff_computer.utils import LineRangeFragment
+        from vscodiff.diff.range_mapping import DetailedLineRangeMapping
+
+        rng = random.Random(0)
+        for _ in range(20):
+            original_lines: list[str] = []
+            modified_lines: list[str] = []
+            changes: list[DetailedLineRangeMapping] = []
+            for _ in range(30):
+                block = [
+                    "".join(rng.choice("abc ") for _ in range(rng.randint(5, 40)))
+                    for _ in range(rng.randint(3, 6))
+                ]
+                if rng.random() < 0.5:
+                    start = len(original_lines) + 1
+                    original_lines += block
+                    changes.append(
+                        DetailedLineRangeMapping(
+                            LineRange(start, start + len(block)),
+                            LineRange(len(modified_lines) + 1, len(modified_lines) + 1),
+                        )
+                    )
+                else:
+                    start = len(modified_lines) + 1
+                    modified_lines += block
+                    changes.append(
+                        DetailedLineRangeMapping(
+                            LineRange(len(original_lines) + 1, len(original_lines) + 1),
+                            LineRange(start, start + len(block)),
+                        )
+                    )
+
+            deletions = [
+                LineRangeFragment(c.original, original_lines, c)
+                for c in changes
+                if c.modified.is_empty
+            ]
+            insertions = [
+                LineRangeFragment(c.modified, modified_lines, c)
+                for c in changes
+                if c.original.is_empty
+            ]
+            expected = []
+            for deletion in deletions:
+                similarities = [deletion.compute_similarity(i) for i in insertions]
+                if similarities and max(similarities) > 0.9:
+                    best = insertions.pop(similarities.index(max(similarities)))
+                    expected.append((deletion.range, best.range))
+
+            moves, excluded = _compute_moves_from_simple_deletions_to_simple_insertions(
+                changes, original_lines, modified_lines, InfiniteTimeout.instance
+            )
+            assert [(m.original, m.modified) for m in moves] == expected
+            assert len(excluded) == 2 * len(expected)
+
+    def test_fragment_similarity_matches_character_histograms(self):
+        import random
+
+        from vscodiff.common.line_range import LineRange
+        from vscodiff.diff.default_lines_diff_computer.utils import LineRangeFragment
+        from vscodiff.diff.range_mapping import DetailedLineRangeMapping
+
+        def histogram(lines: list[str]) -> dict[str, int]:
+            counts: dict[str, int] = {}
+            for char in "".join(line + "\n" for line in lines):
+                counts[char] = counts.get(char, 0) + 1
+
+            return counts
+
+        rng = random.Random(0)
+        source = DetailedLineRangeMapping(LineRange(1, 1), LineRange(1, 1))
+        for _ in range(50):
+            lines = [
+                "".join(rng.choice("ab\té😀 ") for _ in range(rng.randint(0, 12)))
+                for _ in range(8)
+            ]
+            range1 = LineRange(rng.randint(1, 4), rng.randint(5, 9))
+            range2 = LineRange(rng.randint(1, 4), rng.randint(5, 9))
+            fragment1 = LineRangeFragment(range1, lines, source)
+            fragment2 = LineRangeFragment(range2, lines, source)
+
+            h1 = histogram(lines[range1.start_line - 1 : range1.end_line_exclusive - 1])
+            h2 = histogram(lines[range2.start_line - 1 : range2.end_line_exclusive - 1])
+            total = sum(h1.values()) + sum(h2.values())
+            differences = sum(
+                abs(h1.get(c, 0) - h2.get(c, 0)) for c in h1.keys() | h2.keys()
+            )
+            assert fragment1.total_count == sum(h1.values())
+            assert fragment1.compute_similarity(fragment2) == 1 - differences / total
+            assert fragment2.compute_similarity(fragment1) == 1 - differences / total
+
+
+# ---------------------------------------------------------------------------
+# DateTimeout
+# ---------------------------------------------------------------------------
+
+
+class TestDateTimeout:
+    def _timeout(self, monkeypatch, timeout: int):
+        from vscodiff.diff.default_lines_diff_computer.algorithms import diff_algorithm
+
+        clock = {"now": 0.0, "reads": 0}
+
+        def monotonic() -> float:
+            clock["reads"] += 1
+            return clock["now"]
+
+        monkeypatch.setattr(diff_algorithm.time, "monotonic", monotonic)
+        return diff_algorithm.DateTimeout(timeout), clock
+
+    def test_reads_clock_less_often_for_fast_calls(self, monkeypatch):
+        timeout, clock = self._timeout(monkeypatch, 10)
+        for _ in range(1000):
+            assert timeout.is_valid()
+
+        assert clock["reads"] < 50
+
+        clock["now"] = 0.011
+        results = [timeout.is_valid() for _ in range(timeout.MAX_CALLS_PER_CHECK)]
+        assert results[-1] is False
+        assert timeout.is_valid() is False
+
+    def test_reads_clock_every_call_for_slow_calls(self, monkeypatch):
+        timeout, clock = self._timeout(monkeypatch, 10)
+        for _ in range(4):
+            clock["now"] += 0.002
+            assert timeout.is_valid()
+
+        assert clock["reads"] == 5
+
+    def test_disable(self, monkeypatch):
+        timeout, clock = self._timeout(monkeypatch, 10)
+        clock["now"] = 0.011
+        assert timeout.is_valid() is False
+
+        timeout.disable()
+        assert timeout.is_valid()
+
+
+# ---------------------------------------------------------------------------
+# MyersDiffAlgorithm
+# ---------------------------------------------------------------------------
+
+
+def _edit_distance(diffs) -> int:
+    return sum(len(d.seq1_range) + len(d.seq2_range) for d in diffs)
+
+
+def _apply_sequence_diffs(diffs, seq1: list[int], seq2: list[int]) -> list[int]:
+    result: list[int] = []
+    last = 0
+    for d in diffs:
+        result.extend(seq1[last : d.seq1_range.start])
+        result.extend(seq2[d.seq2_range.start : d.seq2_range.end_exclusive])
+        last = d.seq1_range.end_exclusive
+
+    result.extend(seq1[last:])
+    return result
+
+
+class _CountdownTimeout(Timeout):
+    """Expires after ``calls`` checks, so timeouts are deterministic."""
+
+    def __init__(self, calls: int):
+        self._calls = calls
+
+    def is_valid(self) -> bool:
+        self._calls -= 1
+        return self._calls >= 0
+
+
+class TestMyersDiffAlgorithm:
+    def _sequences(self, seed: int):
+        import random
+
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        rng = random.Random(seed)
+        seq1 = [rng.randrange(4) for _ in range(rng.randint(1, 60))]
+        seq2 = [rng.randrange(4) for _ in range(rng.randint(1, 60))]
+        return (
+            seq1,
+            seq2,
+            LineSequence(seq1, [""] * len(seq1)),
+            LineSequence(seq2, [""] * len(seq2)),
+        )
+
+    def test_identical_sequences(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+            MyersDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        seq = LineSequence([1, 2], ["a", "b"])
+        assert MyersDiffAlgorithm().compute(seq, seq).diffs == []
+
+    def test_linear_space_finds_shortest_edit_script(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.linear_space_myers_diff_algorithm import (
+            LinearSpaceMyersDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+            MyersDiffAlgorithm,
+        )
+
+        for seed in range(200):
+            seq1, seq2, sequence1, sequence2 = self._sequences(seed)
+            greedy = MyersDiffAlgorithm().compute(sequence1, sequence2).diffs
+            linear = LinearSpaceMyersDiffAlgorithm().compute(sequence1, sequence2)
+
+            assert not linear.hit_timeout
+            assert _apply_sequence_diffs(linear.diffs, seq1, seq2) == seq2
+            assert _edit_distance(linear.diffs) == _edit_distance(greedy)
+
+    def test_falls_back_to_linear_space(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+            MyersDiffAlgorithm,
+        )
+
+        for seed in range(50):
+            seq1, seq2, sequence1, sequence2 = self._sequences(seed)
+            greedy = MyersDiffAlgorithm().compute(sequence1, sequence2).diffs
+            capped = MyersDiffAlgorithm(max_snakes=4).compute(sequence1, sequence2)
+
+            assert _apply_sequence_diffs(capped.diffs, seq1, seq2) == seq2
+            assert _edit_distance(capped.diffs) == _edit_distance(greedy)
+
+    def test_timeout_keeps_resolved_diffs(self):
+        from vscodiff.common.offset_range import OffsetRange
+        from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+            MyersDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        seq1 = list(range(100))
+        seq2 = list(seq1)
+        seq2[10] = -1
+        seq2[60] = -2
+        seq2[90] = -3
+        result = MyersDiffAlgorithm().compute(
+            LineSequence(seq1, [""] * len(seq1)),
+            LineSequence(seq2, [""] * len(seq2)),
+            _CountdownTimeout(3),
+        )
+        assert result.hit_timeout
+        assert [(d.seq1_range, d.seq2_range) for d in result.diffs] == [
+            (OffsetRange(10, 11), OffsetRange(10, 11)),
+            (OffsetRange(60, 91), OffsetRange(60, 91)),
+        ]
+
+    def test_timeout_results_turn_first_into_second(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+            BitParallelLcsDiffing,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.dynamic_programming_diffing import (
+            DynamicProgrammingDiffing,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.histogram_diff_algorithm import (
+            HistogramDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.linear_space_myers_diff_algorithm import (
+            LinearSpaceMyersDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.myers_diff_algorithm import (
+            MyersDiffAlgorithm,
+        )
+
+        algorithms = [
+            MyersDiffAlgorithm(),
+            LinearSpaceMyersDiffAlgorithm(),
+            DynamicProgrammingDiffing(),
+            BitParallelLcsDiffing(),
+            HistogramDiffAlgorithm(1),
+        ]
+        cases = [self._sequences(seed) for seed in range(50)]
+        # Identical sequences, which Myers only finishes at the second level.
+        cases += [(c[0], c[0], c[2], c[2]) for c in cases[:10]]
+        for seq1, seq2, sequence1, sequence2 in cases:
+            for algorithm in algorithms:
+                for calls in (0, 1, 2, 5):
+                    result = algorithm.compute(
+                        sequence1, sequence2, _CountdownTimeout(calls)
+                    )
+                    diffs = result.diffs
+                    assert _apply_sequence_diffs(diffs, seq1, seq2) == seq2
+                    for d in diffs:
+                        assert len(d.seq1_range) or len(d.seq2_range)
+
+
+# ---------------------------------------------------------------------------
+# DynamicProgrammingDiffing
+# ---------------------------------------------------------------------------
+
+
+class TestDynamicProgrammingDiffing:
+    def _compute(self, seq1: list[int], seq2: list[int]):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.dynamic_programming_diffing import (
+            DynamicProgrammingDiffing,
+        )
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        return DynamicProgrammingDiffing().compute(
+            LineSequence(seq1, [""] * len(seq1)),
+            LineSequence(seq2, [""] * len(seq2)),
+        )
+
+    def test_single_replacement(self):
+        from vscodiff.common.offset_range import OffsetRange
+
+        result = self._compute([1, 2, 3, 4], [1, 5, 3, 4])
+        assert [(d.seq1_range, d.seq2_range) for d in result.diffs] == [
+            (OffsetRange(1, 2), OffsetRange(1, 2))
+        ]
+
+    def test_diffs_turn_first_into_second(self):
+        for seed in range(50):
+            seq1, seq2, _, _ = TestMyersDiffAlgorithm()._sequences(seed)
+            diffs = self._compute(seq1, seq2).diffs
+            assert _apply_sequence_diffs(diffs, seq1, seq2) == seq2
+
+    def test_vectorized_tables_match(self):
+        pytest.importorskip("numpy")
+        import math
+        import random
+
+        from vscodiff.diff.default_lines_diff_computer.algorithms.diff_algorithm import (
+            InfiniteTimeout,
+        )
+        from vscodiff.diff.default_lines_diff_computer.algorithms.dynamic_programming_diffing import (
+            _fill_tables,
+            _fill_tables_vectorized,
+        )
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        rng = random.Random(0)
+        for _ in range(100):
+            lines1 = [rng.choice(["", "a", "bb  ", "ccc"]) for _ in range(40)]
+            lines2 = [rng.choice(["", "a", "bb  ", "ccc"]) for _ in range(30)]
+            seq1 = LineSequence([len(line.strip()) for line in lines1], lines1)
+            seq2 = LineSequence([len(line.strip()) for line in lines2], lines2)
+
+            calls: list[list[tuple[int, int]]] = [[], []]
+
+            def equality_score(calls: list[tuple[int, int]]):
+                def score(offset1: int, offset2: int) -> float:
+                    calls.append((offset1, offset2))
+                    if lines1[offset1] != lines2[offset2]:
+                        return 0.99
+                    return 1 + math.log(1 + len(lines2[offset2]))
+
+                return score
+
+            expected = _fill_tables(
+                seq1, seq2, InfiniteTimeout.instance, equality_score(calls[0])
+            )
+            actual = _fill_tables_vectorized(
+                seq1, seq2, InfiniteTimeout.instance, equality_score(calls[1])
+            )
+            assert expected is not None
+            assert actual == bytes(expected)
+            assert calls[0] == calls[1]
+
+
+# ---------------------------------------------------------------------------
+# BitParallelLcsDiffing
+# ---------------------------------------------------------------------------
+
+
+class TestBitParallelLcsDiffing:
+    def test_finds_longest_common_subsequence(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+            BitParallelLcsDiffing,
+        )
+
+        for seed in range(100):
+            seq1, seq2, sequence1, sequence2 = TestMyersDiffAlgorithm()._sequences(seed)
+            lcs = [0] * (len(seq2) + 1)
+            for element in seq1:
+                row = [0]
+                for s2, other in enumerate(seq2):
+                    row.append(
+                        lcs[s2] + 1 if element == other else max(lcs[s2 + 1], row[s2])
+                    )
+                lcs = row
+
+            diffs = BitParallelLcsDiffing().compute(sequence1, sequence2).diffs
+            assert _apply_sequence_diffs(diffs, seq1, seq2) == seq2
+            assert _edit_distance(diffs) == len(seq1) + len(seq2) - 2 * lcs[-1]
+
+    def test_as_char_diff_algorithm(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.bit_parallel_lcs_diffing import (
+            BitParallelLcsDiffing,
+        )
+        from vscodiff.diff.lines_diff_computer import LinesDiffComputerOptions
+        from vscodiff.diff.lines_diff_computers import lines_diff_computers
+
+        computer = lines_diff_computers.get_default(
+            char_diff_algorithm=BitParallelLcsDiffing()
+        )
+        result = computer.compute_diff(
+            ["hello world"],
+            ["hello wurld"],
+            LinesDiffComputerOptions(False, 0, False, False),
+        )
+        assert len(result.changes) == 1
+        assert [
+            (str(m.original_range), str(m.modified_range))
+            for m in result.changes[0].inner_changes or []
+        ] == [("[1, 8 -> 1, 9]", "[1, 8 -> 1, 9]")]
+
+
+# ---------------------------------------------------------------------------
+# HistogramDiffAlgorithm
+# ---------------------------------------------------------------------------
+
+
+class TestHistogramDiffAlgorithm:
+    def test_diffs_turn_first_into_second(self):
+        from vscodiff.diff.default_lines_diff_computer.algorithms.histogram_diff_algorithm import (
+            HistogramDiffAlgorithm,
+        )
+
+        for seed in range(100):
+            seq1, seq2, sequence1, sequence2 = TestMyersDiffAlgorithm()._sequences(seed)
+            for max_occurrences in (1, 64):
+                diffs = (
+                    HistogramDiffAlgorithm(max_occurrences)
+                    .compute(sequence1, sequence2)
+                    .diffs
+                )
+                assert _apply_sequence_diffs(diffs, seq1, seq2) == seq2
+
+    def test_anchors_on_unique_lines(self):
+        from vscodiff.common.offset_range import OffsetRange
+        from vscodiff.diff.default_lines_diff_computer.algorithms.histogram_diff_algorithm import (
+            HistogramDiffAlgorithm,
+        )
+        from vscodiff.diff.default_lines_diff_computer.line_sequence import (
+            LineSequence,
+        )
+
+        # Myers would keep the repeated 1s and move 5; histogram diff keeps the
+        # unique 5 instead.
+        seq1 = [5, 1, 1, 1, 7]
+        seq2 = [1, 1, 1, 5, 7]
+        diffs = (
+            HistogramDiffAlgorithm()
+            .compute(
+                LineSequence(seq1, [""] * len(seq1)),
+                LineSequence(seq2, [""] * len(seq2)),
+            )
+            .diffs
+        )
+        assert [(d.seq1_range, d.seq2_range) for d in diffs] == [
+            (OffsetRange(0, 0), OffsetRange(0, 3)),
+            (OffsetRange(1, 4), OffsetRange(4, 4)),
+        ]
+
+    def test_vscdiff_histogram(self):
+        from vscodiff.engine import DiffOptions, VSCDiff
+
+        original = "\n".join(f"line {i}" for i in range(50))
+        modified = original.replace("line 10", "first").replace("line 30", "second")
+        result = VSCDiff().compute_diff(
+            original, modified, DiffOptions(diff_algorithm="histogram")
+        )
+        assert [
+            (c.original.start_line, c.original.end_line_exclusive)
+            for c in result.changes
+        ] == [(11, 12), (31, 32)]
+
+
 # ---------------------------------------------------------------------------
 # LineSequence
 # ---------------------------------------------------------------------------
@@ -521,3 +1677,79 @@ class TestLinesSliceCharSequence:
         # Range with same start/end line yields empty sequence
         seq = LinesSliceCharSequence(["abc"], Range(1, 1, 1, 1), False)
         assert seq.length == 0
+
+    def test_elements_are_code_points(self):
+        from vscodiff.common.offset_range import OffsetRange
+        from vscodiff.common.range import Range
+        from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import (
+            LinesSliceCharSequence,
+        )
+
+        lines = ["  ab😀 ", "\udc80x", "  tail  "]
+        seq = LinesSliceCharSequence(lines, Range(1, 2, 3, 6), False)
+        assert seq.text == "ab😀\n\udc80x\ntai"
+        assert [seq.get_element(i) for i in range(seq.length)] == [
+            ord(c) for c in seq.text
+        ]
+        assert seq.get_text(OffsetRange(2, 5)) == "😀\n\udc80"
+        assert str(seq.translate_range(OffsetRange(7, 9))) == "[3, 3 -> 3, 5]"
+
+    def test_boundary_scores_match_categories(self):
+        from vscodiff.common.range import Range
+        from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import (
+            LinesSliceCharSequence,
+            _get_boundary_score,
+            _get_category,
+        )
+
+        lines = ["fooBar, x;\r", "\t1 é😀\udc80 _(a)", "EndOfText"]
+        seq = LinesSliceCharSequence(lines, Range(1, 1, 3, 10), True)
+        elements = [-1] + [seq.get_element(i) for i in range(seq.length)] + [-1]
+        for length in range(seq.length + 1):
+            assert seq.get_boundary_score(length) == _get_boundary_score(
+                _get_category(elements[length]), _get_category(elements[length + 1])
+            )
+
+    def test_find_word_and_sub_word_containing(self):
+        from vscodiff.common.offset_range import OffsetRange
+        from vscodiff.common.range import Range
+        from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import (
+            LinesSliceCharSequence,
+        )
+
+        seq = LinesSliceCharSequence(
+            ["fooBarBAZ qux_1x2Y é", "aB"], Range(1, 1, 2, 3), True
+        )
+        assert seq.find_word_containing(-1) is None
+        assert seq.find_word_containing(9) is None
+        assert seq.find_word_containing(4) == OffsetRange(0, 9)
+        assert seq.find_word_containing(14) == OffsetRange(14, 18)
+        assert seq.find_word_containing(21) == OffsetRange(21, 23)
+        assert seq.find_sub_word_containing(19) is None
+        assert seq.find_sub_word_containing(1) == OffsetRange(0, 3)
+        assert seq.find_sub_word_containing(4) == OffsetRange(3, 6)
+        assert seq.find_sub_word_containing(3) == OffsetRange(3, 3)
+        assert seq.find_sub_word_containing(15) == OffsetRange(14, 17)
+        assert seq.find_sub_word_containing(22) == OffsetRange(22, 22)
+
+    def test_translate_ranges(self):
+        import random
+
+        from vscodiff.common.offset_range import OffsetRange
+        from vscodiff.common.range import Range
+        from vscodiff.diff.default_lines_diff_computer.lines_slice_char_sequence import (
+            LinesSliceCharSequence,
+        )
+
+        lines = ["  first line", "", "\tsecond  ", "x", "  last line  "]
+        seq = LinesSliceCharSequence(lines, Range(1, 3, 5, 10), False)
+        rng = random.Random(0)
+        for _ in range(100):
+            offsets = sorted(rng.randint(0, seq.length) for _ in range(8))
+            ranges = [OffsetRange(offsets[i], offsets[i + 1]) for i in range(0, 8, 2)]
+            assert seq.translate_ranges(ranges) == [
+                seq.translate_range(r) for r in ranges
+            ]
+            assert [seq.translate_offset(o).line for o in offsets] == [
+                1 + seq.text[:o].count("\n") for o in offsets
+            ]